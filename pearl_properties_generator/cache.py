@@ -0,0 +1,65 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, List, Optional, Tuple
+
+
+class DependentCache:
+    def __init__(self, name: str, depends_on: Iterable[str], max_entries: int = 32):
+        self.name = name
+        self.depends_on = frozenset(depends_on)
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key: Hashable, value: Any):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            return self.entries.pop(key, None)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        with self.lock:
+            return list(self.entries.items())
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def depends(self, key: str) -> bool:
+        return key in self.depends_on
+
+    def on_config_changed(self, key: str) -> bool:
+        if not self.depends(key):
+            return False
+        if self.entries:
+            self.invalidations += 1
+        self.clear()
+        return True
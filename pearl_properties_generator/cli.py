@@ -0,0 +1,143 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .config import Config
+from .export import WRITERS, create_writer, open_output
+from .generator import SettingResult, SortBy
+from .planner import Planner
+
+_planner: Optional[Planner] = None
+
+
+def create_planner(values: Dict[str, Any]) -> Planner:
+    config = Config()
+    for key, value in values.items():
+        if not config.set(key, value):
+            raise ValueError(f"invalid value for {key}: {value!r}")
+    return Planner(config)
+
+
+def _init_worker(values: Dict[str, Any]):
+    global _planner
+    _planner = create_planner(values)
+
+
+def _generate(task: Tuple[float, float, str]) -> Tuple[Tuple[float, float], List[SettingResult]]:
+    dest_x, dest_z, sort_by = task
+    return (dest_x, dest_z), _planner.generate(dest_x, dest_z, SortBy(sort_by))
+
+
+def parse_dest(text: str) -> Tuple[float, float]:
+    parts = text.replace(",", " ").split()
+    if len(parts) != 2:
+        raise ValueError(f"invalid destination: {text!r}")
+    return float(parts[0]), float(parts[1])
+
+
+def read_dests(path: str) -> List[Tuple[float, float]]:
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        return [
+            parse_dest(line)
+            for line in (line.split("#", 1)[0].strip() for line in f)
+            if line
+        ]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def run(
+    values: Dict[str, Any],
+    dests: List[Tuple[float, float]],
+    sort_by: SortBy = SortBy.DISTANCE,
+    workers: int = 1,
+) -> Iterator[Tuple[Tuple[float, float], List[SettingResult]]]:
+    tasks = [(dest_x, dest_z, sort_by.value) for dest_x, dest_z in dests]
+
+    if workers <= 1:
+        _init_worker(values)
+        for task in tasks:
+            yield _generate(task)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(values,)) as executor:
+        yield from executor.map(_generate, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m pearl_properties_generator",
+        description="Pearl Properties Generator - 珍珠炮配置生成器 (命令行)",
+    )
+    parser.add_argument(
+        "-d", "--dest", nargs=2, type=float, action="append", default=[], metavar=("X", "Z"),
+        help="目标坐标, 可重复, 例如 -d -1649 0",
+    )
+    parser.add_argument("-f", "--dest-file", help="目标坐标文件, 每行一个 'x z' 或 'x,z', '-' 为标准输入")
+    parser.add_argument("-c", "--config", help="读取 config.json 格式的配置文件 (不会写回)")
+
+    for key, default in Config.DEFAULT_CONFIG.items():
+        parser.add_argument(
+            f"--{key.replace('_', '-')}",
+            dest=key,
+            type=type(default),
+            choices=Config.get_choices(key),
+            help=f"默认 {default}",
+        )
+
+    parser.add_argument("--sort", default=SortBy.DISTANCE.value, choices=[s.value for s in SortBy])
+    parser.add_argument("--format", default="json", choices=list(WRITERS))
+    parser.add_argument("-o", "--output", default="-", help="输出文件, 默认标准输出")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="并行进程数")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    values: Dict[str, Any] = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            values.update({k: v for k, v in json.load(f).items() if k in Config.DEFAULT_CONFIG})
+    for key in Config.DEFAULT_CONFIG:
+        if getattr(args, key) is not None:
+            values[key] = getattr(args, key)
+
+    try:
+        dests = [(dest_x, dest_z) for dest_x, dest_z in args.dest]
+        if args.dest_file:
+            dests += read_dests(args.dest_file)
+        create_planner(values).close()
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if not dests:
+        parser.error("no destination given")
+
+    binary = WRITERS[args.format].BINARY
+    if args.output == "-":
+        stream = sys.stdout.buffer if binary else sys.stdout
+    else:
+        stream = open_output(args.output, args.format)
+
+    start = time.perf_counter()
+    writer = create_writer(args.format, stream)
+    try:
+        for dest, results in run(values, dests, SortBy(args.sort), args.workers):
+            writer.write(dest, results)
+        writer.close()
+    finally:
+        if stream not in (sys.stdout, sys.stdout.buffer):
+            stream.close()
+
+    print(
+        f"{len(dests)} destinations, {writer.count} results, {time.perf_counter() - start:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
@@ -1,8 +1,8 @@
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from mcdreforged.api.all import PluginServerInterface
+from .engines import ENGINES as ENGINE_REGISTRY
 
 
 class Config:
@@ -15,25 +15,58 @@ class Config:
         "ground_y": 0.0,
         "max_tick": 1000,
         "max_results": 100,
+        "search_mode": "exhaustive",
+        "pareto_tolerance": 1.0,
+        "sensitivity": 0,
+        "engine": "auto",
+        "max_radius": 64.0,
+        "shared_folder": "",
+        "service_port": 0,
     }
 
     ROTATION_NAMES = ["None", "CW_90", "CW_180", "CCW_90"]
 
+    SEARCH_MODES = ["exhaustive", "coarse", "solver", "adaptive", "pareto"]
+
     CONFIG_KEYS = list(DEFAULT_CONFIG.keys())
+    PROFILE_KEYS = ["pearl_x", "pearl_z", "player_y", "rotation"]
+    ADMIN_KEYS = ["max_radius", "shared_folder", "service_port"]
+    CONFIG_CHOICES = {
+        "rotation": list(range(len(ROTATION_NAMES))),
+        "search_mode": SEARCH_MODES,
+    }
     CONFIG_ALIASES = {
         "px": "pearl_x",
         "pz": "pearl_z",
         "py": "player_y",
         "gy": "ground_y",
+        "tol": "pareto_tolerance",
+        "sens": "sensitivity",
     }
 
-    def __init__(self, server: PluginServerInterface):
-        self.server = server
-        self.config_path = os.path.join(
-            server.get_data_folder(), "config.json"
-        )
-        self.data: Dict[str, Any] = {}
-        self.load()
+    def __init__(self, config_path: Optional[str] = None):
+        self.config_path = config_path
+        self.data: Dict[str, Any] = dict(self.DEFAULT_CONFIG)
+        self.listeners: List[Callable[[str], None]] = []
+        if config_path is not None:
+            self.load()
+
+    @property
+    def data_folder(self) -> str:
+        if self.config_path is None:
+            return os.getcwd()
+        return os.path.dirname(self.config_path)
+
+    def add_listener(self, listener: Callable[[str], None]):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str], None]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def publish(self, key: str):
+        for listener in list(self.listeners):
+            listener(key)
 
     def load(self):
         if os.path.exists(self.config_path):
@@ -50,6 +83,8 @@ class Config:
         self.save()
 
     def save(self):
+        if self.config_path is None:
+            return
         os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
         with open(self.config_path, "w", encoding="utf-8") as f:
             json.dump(self.data, f, indent=4, ensure_ascii=False)
@@ -63,6 +98,7 @@ class Config:
         if real_key not in self.DEFAULT_CONFIG:
             return False
 
+        old_value = self.data.get(real_key)
         expected_type = type(self.DEFAULT_CONFIG[real_key])
         try:
             if expected_type == int:
@@ -74,12 +110,61 @@ class Config:
         except (ValueError, TypeError):
             return False
 
+        choices = self.get_choices(real_key)
+        if choices is not None and self.data[real_key] not in choices:
+            self.data[real_key] = old_value
+            return False
+
         self.save()
+        if self.data[real_key] != old_value:
+            self.publish(real_key)
         return True
 
     def reset(self):
+        old_data = self.data
         self.data = dict(self.DEFAULT_CONFIG)
+        if "profiles" in old_data:
+            self.data["profiles"] = old_data["profiles"]
+        for key in self.ADMIN_KEYS:
+            if key in old_data:
+                self.data[key] = old_data[key]
+        self.save()
+        for key in self.CONFIG_KEYS:
+            if old_data.get(key) != self.data[key]:
+                self.publish(key)
+
+    def get_profiles(self) -> Dict[str, Dict[str, Any]]:
+        return self.data.setdefault("profiles", {})
+
+    def save_profile(self, name: str):
+        self.get_profiles()[name] = {key: self.get(key) for key in self.PROFILE_KEYS}
         self.save()
+        self.publish("profiles")
+
+    def remove_profile(self, name: str) -> bool:
+        if self.get_profiles().pop(name, None) is None:
+            return False
+        self.save()
+        self.publish("profiles")
+        return True
+
+    def apply_profile(self, name: str) -> bool:
+        profile = self.get_profiles().get(name)
+        if profile is None:
+            return False
+        for key, value in profile.items():
+            self.set(key, value)
+        return True
+
+    @staticmethod
+    def engine_names() -> List[str]:
+        return ["auto"] + list(ENGINE_REGISTRY)
+
+    @classmethod
+    def get_choices(cls, key: str) -> Optional[List[Any]]:
+        if key == "engine":
+            return cls.engine_names()
+        return cls.CONFIG_CHOICES.get(key)
 
     def get_rotation_name(self) -> str:
         return self.ROTATION_NAMES[self.data.get("rotation", 0)]
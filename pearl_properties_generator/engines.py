@@ -0,0 +1,298 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Type
+
+from .generator import (
+    BaseResult,
+    Constant,
+    PearlPropertiesGenerator,
+    Segment,
+    Setting,
+    TraceBatch,
+    TraceSimulator,
+    Vec3d,
+    get_scale,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Simulation = Tuple[Optional[BaseResult], bool, Segment]
+
+CALIBRATION_SAMPLES = 256
+CALIBRATION_REPEAT = 2
+
+
+class Engine:
+    NAME = ""
+    EXACT = True
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def simulate(
+        self, generator: PearlPropertiesGenerator, settings: List[Setting], base_dest: Tuple[float, float]
+    ) -> List[Simulation]:
+        return [generator.simulate(s, base_dest) for s in settings]
+
+    def trace(self, simulator: TraceSimulator, bits_list: List[str]) -> TraceBatch:
+        return simulator.simulate_batch_scalar(bits_list)
+
+
+ENGINES: Dict[str, Type[Engine]] = {}
+_instances: Dict[str, Engine] = {}
+
+
+def register_engine(cls: Type[Engine]) -> Type[Engine]:
+    ENGINES[cls.NAME] = cls
+    _instances.pop(cls.NAME, None)
+    return cls
+
+
+def get_engine(name: str) -> Engine:
+    engine = _instances.get(name)
+    if engine is None:
+        engine = ENGINES[name]()
+        _instances[name] = engine
+    return engine
+
+
+def available_engines(exact: bool = False) -> List[str]:
+    return [name for name, cls in ENGINES.items() if cls.available() and (cls.EXACT or not exact)]
+
+
+@register_engine
+class ScalarEngine(Engine):
+    NAME = "scalar"
+
+
+@register_engine
+class NumpyEngine(Engine):
+    NAME = "numpy"
+    MIN_BATCH = 16
+
+    @classmethod
+    def available(cls) -> bool:
+        return np is not None
+
+    def simulate(
+        self, generator: PearlPropertiesGenerator, settings: List[Setting], base_dest: Tuple[float, float]
+    ) -> List[Simulation]:
+        if len(settings) < self.MIN_BATCH:
+            return super().simulate(generator, settings, base_dest)
+
+        dest_x, dest_z = base_dest
+        ground = generator.ground
+        size = generator.SEGMENT_TICKS
+        n = len(settings)
+
+        pitch = np.array([s.pitch for s in settings], dtype=np.intp)
+        amount_l = np.array([s.amount_l for s in settings], dtype=float)
+        amount_r = np.array([s.amount_r for s in settings], dtype=float)
+
+        def constant(vectors: List[Vec3d], axis: str):
+            return np.array([getattr(v, axis) for v in vectors], dtype=float)[pitch]
+
+        tx, ty, tz = (constant(Constant.THRUST, axis) for axis in "xyz")
+        x, y, z = (0.0 + constant(Constant.DELTA_POSITION, axis) for axis in "xyz")
+        mx = constant(Constant.MOTION, "x") + (tx * amount_l - tx * amount_r)
+        my = constant(Constant.MOTION, "y") + (ty * amount_l + ty * amount_r)
+        mz = constant(Constant.MOTION, "z") + (tz * amount_l + tz * amount_r)
+
+        rows = np.arange(n)
+        mn = np.full(n, 1e10)
+        ring = np.zeros((size, 3, n))
+
+        out_distance = np.full(n, 1e10)
+        out_best = np.zeros((3, n))
+        out_tick = np.full(n, -1, dtype=np.int64)
+        out_end = np.full(n, generator.max_tick, dtype=np.int64)
+        out_complete = np.ones(n, dtype=bool)
+        out_state = np.zeros((6, n))
+        out_ring = np.zeros((size, 3, n))
+
+        for tick in range(generator.max_tick):
+            x += mx
+            y += my
+            z += mz
+            mx *= 0.99
+            my *= 0.99
+            mz *= 0.99
+            my -= 0.03
+
+            slot = ring[tick % size]
+            slot[0] = x
+            slot[1] = y
+            slot[2] = z
+
+            below = y < ground
+            dx = x - dest_x
+            dz = z - dest_z
+            dis = np.sqrt(dx * dx + dz * dz)
+            improve = (dis < mn) & ~below
+
+            idx = rows[improve]
+            mn[improve] = dis[improve]
+            out_distance[idx] = dis[improve]
+            out_best[:, idx] = np.stack((x[improve], y[improve], z[improve]))
+            out_tick[idx] = tick + 1
+
+            if improve.all():
+                continue
+
+            stop = ~improve
+            idx = rows[stop]
+            out_end[idx] = tick + 1
+            out_complete[idx] = ~below[stop]
+            out_state[:, idx] = np.stack((x[stop], y[stop], z[stop], mx[stop], my[stop], mz[stop]))
+            out_ring[:, :, idx] = ring[:, :, stop]
+
+            rows = rows[improve]
+            if not rows.size:
+                break
+            x, y, z, mx, my, mz, mn = (a[improve] for a in (x, y, z, mx, my, mz, mn))
+            ring = ring[:, :, improve]
+
+        if rows.size:
+            out_state[:, rows] = np.stack((x, y, z, mx, my, mz))
+            out_ring[:, :, rows] = ring
+
+        starts = out_end - np.minimum(out_end, size)
+        slots = (starts[:, None] + np.arange(size)) % size
+        traces = out_ring[slots, :, np.arange(n)[:, None]].reshape(n, 3 * size).tolist()
+
+        starts = starts.tolist()
+        distances = out_distance.tolist()
+        best = out_best.T.tolist()
+        ticks = out_tick.tolist()
+        ends = out_end.tolist()
+        completes = out_complete.tolist()
+        states = out_state.T.tolist()
+
+        simulations = []
+        for i, s in enumerate(settings):
+            start = starts[i]
+            segment = (start, traces[i][:3 * (ends[i] - start)], tuple(states[i]))
+            result = None
+            if ticks[i] > 0:
+                result = BaseResult(distances[i], Vec3d(*best[i]), ticks[i], s.amount_l, s.amount_r, s.pitch)
+            simulations.append((result, completes[i], segment))
+        return simulations
+
+    def trace(self, simulator: TraceSimulator, bits_list: List[str]) -> TraceBatch:
+        return simulator.simulate_batch_numpy(bits_list)
+
+
+@register_engine
+class ClosedFormEngine(Engine):
+    NAME = "closed_form"
+    EXACT = False
+    TOLERANCE = 1e-6
+
+    def simulate(
+        self, generator: PearlPropertiesGenerator, settings: List[Setting], base_dest: Tuple[float, float]
+    ) -> List[Simulation]:
+        dest_x, dest_z = base_dest
+        max_tick = generator.max_tick
+        scale = get_scale(max_tick)
+        table = generator.get_landing_table()
+        simulations = []
+
+        for s in settings:
+            thrust = s.get_base_thrust()
+            delta = Constant.DELTA_POSITION[s.pitch]
+            motion = Constant.MOTION[s.pitch]
+            vx = motion.x + thrust.x
+            vy = motion.y + thrust.y
+            vz = motion.z + thrust.z
+            total_tnt = s.amount_l + s.amount_r
+            landing_tick = table.landing_tick(s.pitch, total_tnt)
+
+            def position(tick: int) -> Tuple[float, float, float]:
+                return (
+                    delta.x + vx * scale[tick],
+                    table.height(s.pitch, total_tnt, tick),
+                    delta.z + vz * scale[tick],
+                )
+
+            def distance(tick: int) -> float:
+                return math.hypot(delta.x + vx * scale[tick] - dest_x, delta.z + vz * scale[tick] - dest_z)
+
+            lo, hi = 1, landing_tick
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if distance(mid + 1) >= distance(mid):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            tick = min(lo, landing_tick)
+
+            if tick < landing_tick:
+                end, complete = tick + 1, True
+            else:
+                end, complete = min(landing_tick + 1, max_tick), landing_tick == max_tick
+
+            start = end - min(end, generator.SEGMENT_TICKS)
+            decay = 0.99 ** end
+            segment = (
+                start,
+                [c for t in range(start + 1, end + 1) for c in position(t)],
+                position(end) + (vx * decay, (vy + 3) * decay - 3, vz * decay),
+            )
+
+            result = None
+            if tick > 0:
+                result = BaseResult(distance(tick), Vec3d(*position(tick)), tick, s.amount_l, s.amount_r, s.pitch)
+            simulations.append((result, complete, segment))
+
+        return simulations
+
+
+@dataclass
+class Calibration:
+    engine: str
+    timings: Dict[str, float]
+    samples: int
+
+
+def get_calibration_target(generator: PearlPropertiesGenerator) -> Optional[Tuple[float, float]]:
+    s = Setting(generator.max_tnt // 2, generator.max_tnt // 4, 0, 0)
+    tick = generator._landing_tick(s.pitch, s.amount_l + s.amount_r)
+    if tick == 0:
+        return None
+    position = generator._truncate(s, (0.0, 0.0), tick).position
+    return position.x, position.z
+
+
+def calibrate(
+    max_tnt: int,
+    max_tick: int,
+    ground: float,
+    rotation: int = 0,
+    names: Optional[List[str]] = None,
+) -> Calibration:
+    if names is None:
+        names = available_engines(exact=True)
+
+    generator = PearlPropertiesGenerator(0.0, 0.0, 0.0, rotation, max_tnt, ground, max_tick, 0.0, 0.0)
+    base_dest = get_calibration_target(generator)
+    candidates = generator.candidates(base_dest) if base_dest is not None else []
+    sample = candidates[::max(1, len(candidates) // CALIBRATION_SAMPLES)][:CALIBRATION_SAMPLES]
+
+    timings = {}
+    if sample:
+        for name in names:
+            engine = get_engine(name)
+            elapsed = math.inf
+            for _ in range(CALIBRATION_REPEAT):
+                start = time.perf_counter()
+                engine.simulate(generator, sample, base_dest)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            timings[name] = elapsed
+
+    engine = min(timings, key=timings.get) if timings else ScalarEngine.NAME
+    return Calibration(engine, timings, len(sample))
@@ -0,0 +1,726 @@
+import math
+import os
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from mcdreforged.api.all import *
+
+from .config import Config
+from .generator import PearlPropertiesGenerator, SettingResult, SortBy, TraceBatch, sort_results
+from .planner import Planner
+from .profiles import CannonProfiles
+from .profiling import profile_call
+from .export import WRITERS, export_results
+from .reachmap import export_reach_map
+from .service import QueryService
+from .waypoints import Waypoints
+from .ui import (
+    PREFIX,
+    CannonUI,
+    ChunkUI,
+    ResultsUI,
+    SettingsUI,
+    StatsUI,
+    TraceCompareUI,
+    TraceUI,
+    WaypointUI,
+    show_error,
+    show_help,
+    show_success,
+)
+
+
+config: Optional[Config] = None
+planner: Optional[Planner] = None
+profiles: Optional[CannonProfiles] = None
+service: Optional[QueryService] = None
+waypoints: Optional[Waypoints] = None
+cached_results: Dict[str, List[SettingResult]] = {}
+cached_dest: Dict[str, tuple] = {}
+cached_batches: Dict[str, TraceBatch] = {}
+
+MAX_COMPARE = 8
+
+
+class DestinationArgument(ArgumentNode):
+    """A float coordinate, or a waypoint name written as ``@name``"""
+
+    def parse(self, text: str) -> ParseResult:
+        arg = command_builder_util.get_element(text)
+        if arg.startswith("@") and len(arg) > 1:
+            return ParseResult(arg[1:], len(arg))
+        value, read = command_builder_util.get_float(text)
+        if value is None:
+            raise InvalidFloat(read)
+        return ParseResult(value, read)
+
+
+def get_cache_key(source: CommandSource) -> str:
+    if isinstance(source, PlayerCommandSource):
+        return source.player
+    return "__console__"
+
+
+def on_load(server: PluginServerInterface, old):
+    global config, planner, profiles, service, waypoints
+    config = Config(os.path.join(server.get_data_folder(), "config.json"))
+    planner = Planner(config)
+    profiles = CannonProfiles(config, planner)
+    service = QueryService(planner)
+    service.apply_config()
+    if service.error is not None:
+        server.logger.warning(f"无法启动查询服务: {service.error}")
+    waypoints = Waypoints(planner, os.path.join(server.get_data_folder(), "waypoints.json"))
+    waypoints.start()
+
+    server.register_help_message(PREFIX, "Pearl Properties Generator - 珍珠炮配置生成器")
+
+    server.register_command(
+        Literal(PREFIX)
+        .runs(lambda src: show_help(src))
+        .then(
+            Literal("set")
+            .runs(cmd_show_settings)
+            .then(
+                Text("key")
+                .then(
+                    GreedyText("value")
+                    .runs(lambda src, ctx: cmd_set_config(src, ctx["key"], ctx["value"]))
+                )
+            )
+        )
+        .then(
+            Literal("reset")
+            .runs(cmd_reset_config)
+        )
+        .then(
+            Literal("stats")
+            .runs(cmd_stats)
+        )
+        .then(
+            Literal("gen")
+            .then(
+                DestinationArgument("dest_x")
+                .runs(lambda src, ctx: cmd_generate_destination(src, ctx["dest_x"]))
+                .then(
+                    Float("dest_z")
+                    .requires(
+                        lambda src, ctx: not isinstance(ctx["dest_x"], str),
+                        lambda: f"[PPG] 路径点后不能再跟坐标, 用法: {PREFIX} gen @<name>",
+                    )
+                    .runs(lambda src, ctx: cmd_generate(src, ctx["dest_x"], ctx["dest_z"]))
+                    .then(
+                        Literal("pareto")
+                        .runs(lambda src, ctx: cmd_generate(src, ctx["dest_x"], ctx["dest_z"], "pareto"))
+                    )
+                    .then(
+                        Literal("--all")
+                        .runs(lambda src, ctx: cmd_generate_all(src, ctx["dest_x"], ctx["dest_z"]))
+                    )
+                )
+            )
+        )
+        .then(
+            Literal("waypoint")
+            .runs(cmd_show_waypoints)
+            .then(
+                Literal("gen")
+                .then(
+                    Text("name")
+                    .runs(lambda src, ctx: cmd_generate_waypoint(src, ctx["name"]))
+                )
+            )
+            .then(
+                Literal("add")
+                .then(
+                    Text("name")
+                    .then(
+                        Float("x")
+                        .then(
+                            Float("z")
+                            .runs(lambda src, ctx: cmd_add_waypoint(src, ctx["name"], ctx["x"], ctx["z"]))
+                        )
+                    )
+                )
+            )
+            .then(
+                Literal("remove")
+                .then(
+                    Text("name")
+                    .runs(lambda src, ctx: cmd_remove_waypoint(src, ctx["name"]))
+                )
+            )
+            .then(
+                Literal("refresh")
+                .runs(cmd_refresh_waypoints)
+            )
+        )
+        .then(
+            Literal("cannon")
+            .runs(cmd_show_cannons)
+            .then(
+                Literal("save")
+                .then(
+                    Text("name")
+                    .runs(lambda src, ctx: cmd_save_cannon(src, ctx["name"]))
+                )
+            )
+            .then(
+                Literal("use")
+                .then(
+                    Text("name")
+                    .runs(lambda src, ctx: cmd_use_cannon(src, ctx["name"]))
+                )
+            )
+            .then(
+                Literal("remove")
+                .then(
+                    Text("name")
+                    .runs(lambda src, ctx: cmd_remove_cannon(src, ctx["name"]))
+                )
+            )
+        )
+        .then(
+            Literal("near")
+            .then(
+                Float("dest_x")
+                .then(
+                    Float("dest_z")
+                    .then(
+                        Float("radius")
+                        .runs(lambda src, ctx: cmd_near(src, ctx["dest_x"], ctx["dest_z"], ctx["radius"]))
+                    )
+                )
+            )
+        )
+        .then(
+            Literal("chunks")
+            .then(
+                Literal("through")
+                .then(
+                    Integer("chunk_x")
+                    .then(
+                        Integer("chunk_z")
+                        .runs(lambda src, ctx: cmd_filter_chunk(src, ctx["chunk_x"], ctx["chunk_z"], True))
+                    )
+                )
+            )
+            .then(
+                Literal("avoid")
+                .then(
+                    Integer("chunk_x")
+                    .then(
+                        Integer("chunk_z")
+                        .runs(lambda src, ctx: cmd_filter_chunk(src, ctx["chunk_x"], ctx["chunk_z"], False))
+                    )
+                )
+            )
+            .then(
+                Text("bits")
+                .runs(lambda src, ctx: cmd_chunks(src, ctx["bits"], 1))
+                .then(
+                    Integer("page_num")
+                    .runs(lambda src, ctx: cmd_chunks(src, ctx["bits"], ctx["page_num"]))
+                )
+            )
+        )
+        .then(
+            Literal("profile")
+            .requires(lambda src: src.has_permission(3), lambda: "[PPG] 权限不足, 仅管理员可用")
+            .then(
+                Literal("gen")
+                .then(
+                    Float("dest_x")
+                    .then(
+                        Float("dest_z")
+                        .runs(lambda src, ctx: cmd_profile(
+                            src, "gen", cmd_generate, src, ctx["dest_x"], ctx["dest_z"]
+                        ))
+                    )
+                )
+            )
+            .then(
+                Literal("trace")
+                .then(
+                    Text("bits")
+                    .runs(lambda src, ctx: cmd_profile(src, "trace", cmd_trace, src, ctx["bits"], 1))
+                )
+            )
+        )
+        .then(
+            Literal("export")
+            .then(
+                Text("format")
+                .runs(lambda src, ctx: cmd_export(src, ctx["format"]))
+            )
+        )
+        .then(
+            Literal("map")
+            .runs(lambda src: cmd_reach_map(src, 16.0))
+            .then(
+                Float("cell_size")
+                .runs(lambda src, ctx: cmd_reach_map(src, ctx["cell_size"]))
+            )
+        )
+        .then(
+            Literal("page")
+            .then(
+                Integer("page_num")
+                .runs(lambda src, ctx: cmd_show_page(src, ctx["page_num"], "distance"))
+                .then(
+                    Text("sort_by")
+                    .runs(lambda src, ctx: cmd_show_page(src, ctx["page_num"], ctx["sort_by"]))
+                )
+            )
+        )
+        .then(
+            Literal("trace")
+            .then(
+                Literal("compare")
+                .then(
+                    GreedyText("bits_list")
+                    .runs(lambda src, ctx: cmd_trace_compare(src, ctx["bits_list"].replace(",", " ").split()))
+                )
+            )
+            .then(
+                Literal("top")
+                .then(
+                    Integer("count")
+                    .runs(lambda src, ctx: cmd_trace_top(src, ctx["count"]))
+                )
+            )
+            .then(
+                Literal("page")
+                .then(
+                    Integer("page_num")
+                    .runs(lambda src, ctx: cmd_trace_page(src, ctx["page_num"]))
+                )
+            )
+            .then(
+                Text("bits")
+                .runs(lambda src, ctx: cmd_trace(src, ctx["bits"], 1))
+                .then(
+                    Integer("page_num")
+                    .runs(lambda src, ctx: cmd_trace(src, ctx["bits"], ctx["page_num"]))
+                )
+            )
+        )
+    )
+
+
+def on_user_info(server: PluginServerInterface, info: Info):
+    if planner is not None and info.content.startswith(PREFIX):
+        planner.touch()
+
+
+def on_unload(server: PluginServerInterface):
+    if planner is not None:
+        planner.close()
+    if profiles is not None:
+        profiles.close()
+    if service is not None:
+        service.close()
+    if waypoints is not None:
+        waypoints.close()
+
+
+def cmd_show_settings(source: CommandSource):
+    ui = SettingsUI(config)
+    source.reply(ui.build())
+
+
+def cmd_set_config(source: CommandSource, key: str, value: str):
+    real_key = Config.resolve_key(key)
+    if real_key is None:
+        show_error(source, f"未知的配置项: {key}")
+        show_error(source, f"可用配置项: {', '.join(Config.CONFIG_KEYS)}")
+        return
+
+    if real_key in Config.ADMIN_KEYS and not source.has_permission(3):
+        show_error(source, f"权限不足, 仅管理员可以修改 {real_key}")
+        return
+
+    if config.set(key, value):
+        show_success(source, f"已设置 {real_key} = {config.get(real_key)}")
+        cmd_show_settings(source)
+    else:
+        show_error(source, f"设置失败: 值 '{value}' 无效")
+
+
+def cmd_reset_config(source: CommandSource):
+    config.reset()
+    show_success(source, "已重置所有配置为默认值")
+    cmd_show_settings(source)
+
+
+def cmd_generate(
+    source: CommandSource, dest_x: float, dest_z: float, search_mode: Optional[str] = None
+):
+    source.reply(RText("[PPG] 正在生成配置，请稍候...", color=RColor.yellow))
+
+    generator = planner.create_generator(dest_x, dest_z, search_mode)
+    results = planner.generate(dest_x, dest_z, SortBy.DISTANCE, generator=generator)
+
+    cache_key = get_cache_key(source)
+    cached_results[cache_key] = results
+    cached_dest[cache_key] = (dest_x, dest_z)
+
+    if not results:
+        show_error(source, "未找到任何有效配置")
+        return
+
+    show_success(
+        source,
+        f"找到 {len(results)} 个配置 (角度窗口 ±{math.degrees(generator.window_width):.4f}°)",
+    )
+    ui = ResultsUI(results, dest_x, dest_z, page=1, sort_by="distance")
+    source.reply(ui.build())
+
+
+def cmd_generate_all(source: CommandSource, dest_x: float, dest_z: float):
+    names = profiles.names()
+    if not names:
+        show_error(source, "没有保存的炮台，请先使用 !!ppg cannon save <name> 保存")
+        return
+
+    source.reply(RText(f"[PPG] 正在搜索 {len(names)} 个炮台，请稍候...", color=RColor.yellow))
+
+    results = profiles.generate_all(dest_x, dest_z)
+
+    cache_key = get_cache_key(source)
+    cached_results[cache_key] = results
+    cached_dest[cache_key] = (dest_x, dest_z)
+
+    if not results:
+        show_error(source, "所有炮台都未找到有效配置")
+        return
+
+    best = results[0]
+    show_success(
+        source,
+        f"在 {len(names)} 个炮台中找到 {len(results)} 个配置，最佳炮台: {best.cannon} "
+        f"(距离 {best.distance:.4f}, {best.tick} tick)",
+    )
+    ui = ResultsUI(results, dest_x, dest_z, page=1, sort_by="distance")
+    source.reply(ui.build())
+
+
+def cmd_generate_destination(source: CommandSource, dest):
+    if isinstance(dest, str):
+        cmd_generate_waypoint(source, dest)
+    else:
+        show_error(source, f"缺少 Z 坐标, 用法: {PREFIX} gen <x> <z> 或 {PREFIX} gen @<name>")
+
+
+def cmd_generate_waypoint(source: CommandSource, name: str):
+    name = name.lstrip("@")
+    waypoint = waypoints.get(name)
+    if waypoint is None:
+        show_error(source, f"未知的路径点: {name}, 使用 {PREFIX} waypoint 查看已保存的路径点")
+        return
+
+    if not waypoints.is_warm(waypoint):
+        source.reply(RText("[PPG] 正在生成配置，请稍候...", color=RColor.yellow))
+    generated = waypoints.generate(name)
+    if generated is None:
+        show_error(source, f"未知的路径点: {name}, 使用 {PREFIX} waypoint 查看已保存的路径点")
+        return
+    results, hit = generated
+
+    cache_key = get_cache_key(source)
+    cached_results[cache_key] = results
+    cached_dest[cache_key] = (waypoint.x, waypoint.z)
+
+    if not results:
+        show_error(source, "未找到任何有效配置")
+        return
+
+    show_success(source, f"路径点 {name}: 找到 {len(results)} 个配置{' (预计算)' if hit else ''}")
+    ui = ResultsUI(results, waypoint.x, waypoint.z, page=1, sort_by="distance")
+    source.reply(ui.build())
+
+
+def cmd_show_waypoints(source: CommandSource):
+    source.reply(WaypointUI(waypoints).build())
+
+
+def cmd_add_waypoint(source: CommandSource, name: str, x: float, z: float):
+    name = name.lstrip("@")
+    if not name:
+        show_error(source, "路径点名称不能为空")
+        return
+    if not waypoints.add(name, x, z):
+        show_error(source, f"最多保存 {Waypoints.MAX_WAYPOINTS} 个路径点")
+        return
+    show_success(source, f"已保存路径点 {name} ({x:g}, {z:g}), 空闲时将自动预计算")
+    cmd_show_waypoints(source)
+
+
+def cmd_remove_waypoint(source: CommandSource, name: str):
+    name = name.lstrip("@")
+    if not waypoints.remove(name):
+        show_error(source, f"未知的路径点: {name}")
+        return
+    show_success(source, f"已删除路径点 {name}")
+    cmd_show_waypoints(source)
+
+
+@new_thread("PPG-WaypointRefresh")
+def cmd_refresh_waypoints(source: CommandSource):
+    source.reply(RText("[PPG] 正在预计算所有路径点，请稍候...", color=RColor.yellow))
+    count = waypoints.refresh()
+    show_success(source, f"已预计算 {count} 个路径点")
+    cmd_show_waypoints(source)
+
+
+def cmd_stats(source: CommandSource):
+    source.reply(StatsUI(planner, service).build())
+
+
+def cmd_show_cannons(source: CommandSource):
+    source.reply(CannonUI(config).build())
+
+
+def cmd_save_cannon(source: CommandSource, name: str):
+    config.save_profile(name)
+    show_success(source, f"已保存炮台 {name}")
+    cmd_show_cannons(source)
+
+
+def cmd_use_cannon(source: CommandSource, name: str):
+    if not config.apply_profile(name):
+        show_error(source, f"未知的炮台: {name}")
+        return
+    show_success(source, f"已切换到炮台 {name}")
+    cmd_show_settings(source)
+
+
+def cmd_remove_cannon(source: CommandSource, name: str):
+    if not config.remove_profile(name):
+        show_error(source, f"未知的炮台: {name}")
+        return
+    show_success(source, f"已删除炮台 {name}")
+    cmd_show_cannons(source)
+
+
+@new_thread("PPG-Near")
+def cmd_near(source: CommandSource, dest_x: float, dest_z: float, radius: float):
+    if radius <= 0:
+        show_error(source, "半径必须大于 0")
+        return
+    max_radius = config.get("max_radius")
+    if radius > max_radius:
+        show_error(source, f"半径不能超过 {max_radius:g} 格 (由管理员通过 max_radius 配置)")
+        return
+
+    source.reply(RText("[PPG] 正在查询范围内的配置，请稍候...", color=RColor.yellow))
+
+    results = planner.near(dest_x, dest_z, radius)
+
+    cache_key = get_cache_key(source)
+    cached_results[cache_key] = results
+    cached_dest[cache_key] = (dest_x, dest_z)
+
+    if not results:
+        show_error(source, f"半径 {radius:g} 格内没有任何配置经过")
+        return
+
+    message = f"找到 {len(results)} 个轨迹经过半径 {radius:g} 格内的配置"
+    if len(results) >= PearlPropertiesGenerator.NEAR_MAX_RESULTS:
+        message += " (已截断为最近的部分)"
+    show_success(source, message)
+    ui = ResultsUI(results, dest_x, dest_z, page=1, sort_by="distance")
+    source.reply(ui.build())
+
+
+def cmd_profile(source: CommandSource, name: str, func, *args):
+    report = profile_call(os.path.join(config.data_folder, "profiling"), name, func, *args)
+
+    show_success(source, f"耗时 {report.elapsed:.3f}s, 最耗时的函数 (自身耗时):")
+    for func_name, calls, tottime, cumtime in report.top[:5]:
+        source.reply(RText(f"  {tottime:8.3f}s {cumtime:8.3f}s {calls:>9} {func_name}", color=RColor.gray))
+    show_success(source, f"已保存: {report.stats_path}, {report.summary_path}")
+
+
+def cmd_export(source: CommandSource, fmt: str):
+    if fmt not in WRITERS:
+        show_error(source, f"未知的导出格式: {fmt}, 可用格式: {', '.join(WRITERS)}")
+        return
+
+    cache_key = get_cache_key(source)
+    results = cached_results.get(cache_key)
+    if not results:
+        show_error(source, "没有缓存的结果，请先使用 !!ppg gen <x> <z> 生成")
+        return
+
+    dest = cached_dest.get(cache_key, (0, 0))
+    name = (
+        f"export_{cache_key}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}.{WRITERS[fmt].EXTENSION}"
+    )
+    path = os.path.join(config.data_folder, "exports", name)
+    export_in_background(source, path, fmt, dest, list(results))
+
+
+@new_thread("PPG-Export")
+def export_in_background(
+    source: CommandSource, path: str, fmt: str, dest: tuple, results: List[SettingResult]
+):
+    cannons = sorted({r.cannon for r in results if r.cannon is not None})
+    count = export_results(path, fmt, [(dest, results)], cannons)
+    show_success(source, f"已导出 {count} 个配置: {path}")
+
+
+@new_thread("PPG-ReachMap")
+def cmd_reach_map(source: CommandSource, cell_size: float):
+    if cell_size <= 0:
+        show_error(source, "网格边长必须大于 0")
+        return
+
+    source.reply(RText("[PPG] 正在生成可达性地图，请稍候...", color=RColor.yellow))
+
+    reach_map = planner.reach_map(cell_size)
+    data_path, png_path = export_reach_map(reach_map, config.data_folder)
+
+    show_success(
+        source,
+        f"可达网格 {reach_map.reachable_cells()}/{reach_map.size ** 2} "
+        f"(网格边长 {reach_map.cell_size:.2f}, 范围 X {reach_map.min_x:.0f}~"
+        f"{reach_map.min_x + reach_map.size * reach_map.cell_size:.0f}, Z {reach_map.min_z:.0f}~"
+        f"{reach_map.min_z + reach_map.size * reach_map.cell_size:.0f})",
+    )
+    show_success(source, f"已保存: {data_path}, {png_path}")
+
+
+def cmd_show_page(source: CommandSource, page_num: int, sort_by: str):
+    cache_key = get_cache_key(source)
+
+    if cache_key not in cached_results or not cached_results[cache_key]:
+        show_error(source, "没有缓存的结果，请先使用 !!ppg gen <x> <z> 生成")
+        return
+
+    results = cached_results[cache_key]
+    dest_x, dest_z = cached_dest.get(cache_key, (0, 0))
+
+    sort_map = {
+        "distance": SortBy.DISTANCE,
+        "tick": SortBy.TICK,
+        "total_tnt": SortBy.TOTAL_TNT,
+        "light_gray": SortBy.LIGHT_GRAY,
+        "dark_gray": SortBy.DARK_GRAY,
+        "drift": SortBy.DRIFT,
+    }
+
+    sort_enum = sort_map.get(sort_by, SortBy.DISTANCE)
+    sort_results(results, sort_enum)
+
+    total_pages = max(1, (len(results) + 9) // 10)
+    page_num = max(1, min(page_num, total_pages))
+
+    ui = ResultsUI(results, dest_x, dest_z, page=page_num, sort_by=sort_by)
+    source.reply(ui.build())
+
+
+def cmd_trace(source: CommandSource, bits: str, page_num: int):
+    bits_clean = ''.join(c for c in bits if c in '01')
+    if len(bits_clean) != 27:
+        show_error(source, f"无效的比特序列: 需要27位，得到{len(bits_clean)}位")
+        return
+
+    start = time.perf_counter()
+    simulator = planner.create_simulator()
+    traces = simulator.simulate(bits_clean)
+    planner.record("trace", bits_clean, simulator.engine, time.perf_counter() - start, 1)
+
+    if not traces:
+        show_error(source, "无法生成轨迹，请检查比特序列")
+        return
+
+    total_pages = max(1, (len(traces) + 9) // 10)
+    page_num = max(1, min(page_num, total_pages))
+
+    ui = TraceUI(traces, bits_clean, page=page_num)
+    source.reply(ui.build())
+
+
+def cmd_chunks(source: CommandSource, bits: str, page_num: int):
+    bits_clean = ''.join(c for c in bits if c in '01')
+    if len(bits_clean) != 27:
+        show_error(source, f"无效的比特序列: 需要27位，得到{len(bits_clean)}位")
+        return
+
+    visits = planner.create_simulator().chunk_visits(bits_clean)
+    if not visits:
+        show_error(source, "无法生成轨迹，请检查比特序列")
+        return
+
+    ui = ChunkUI(visits, bits_clean)
+    ui.page = max(1, min(page_num, ui.total_pages))
+    source.reply(ui.build())
+
+
+def cmd_filter_chunk(source: CommandSource, chunk_x: int, chunk_z: int, through: bool):
+    cache_key = get_cache_key(source)
+    results = cached_results.get(cache_key)
+    if not results:
+        show_error(source, "没有缓存的结果，请先使用 !!ppg gen <x> <z> 生成")
+        return
+
+    filtered = planner.filter_by_chunk(results, (chunk_x, chunk_z), through)
+    action = "经过" if through else "不经过"
+    if not filtered:
+        show_error(source, f"没有{action}区块 [{chunk_x}, {chunk_z}] 的配置")
+        return
+
+    cached_results[cache_key] = filtered
+    dest_x, dest_z = cached_dest.get(cache_key, (0, 0))
+    show_success(source, f"{len(results)} 个配置中有 {len(filtered)} 个{action}区块 [{chunk_x}, {chunk_z}]")
+    ui = ResultsUI(filtered, dest_x, dest_z, page=1, sort_by="distance")
+    source.reply(ui.build())
+
+
+def cmd_trace_compare(source: CommandSource, bits_list: List[str]):
+    bits_list = [''.join(c for c in bits if c in '01') for bits in bits_list]
+    for bits in bits_list:
+        if len(bits) != 27:
+            show_error(source, f"无效的比特序列: 需要27位，得到{len(bits)}位")
+            return
+
+    if not bits_list:
+        show_error(source, "请至少提供一个比特序列")
+        return
+
+    if len(bits_list) > MAX_COMPARE:
+        show_error(source, f"最多同时对比 {MAX_COMPARE} 条轨迹")
+        return
+
+    start = time.perf_counter()
+    simulator = planner.create_simulator()
+    batch = simulator.simulate_batch(bits_list)
+    planner.record(
+        "trace compare", f"{len(bits_list)} 条", simulator.engine, time.perf_counter() - start, len(bits_list)
+    )
+    cached_batches[get_cache_key(source)] = batch
+
+    cmd_trace_page(source, 1)
+
+
+def cmd_trace_top(source: CommandSource, count: int):
+    results = cached_results.get(get_cache_key(source))
+    if not results:
+        show_error(source, "没有缓存的结果，请先使用 !!ppg gen <x> <z> 生成")
+        return
+
+    count = max(1, min(count, MAX_COMPARE))
+    cmd_trace_compare(source, [r.bits for r in results[:count]])
+
+
+def cmd_trace_page(source: CommandSource, page_num: int):
+    batch = cached_batches.get(get_cache_key(source))
+    if batch is None:
+        show_error(source, "没有缓存的轨迹对比，请先使用 !!ppg trace compare 或 !!ppg trace top")
+        return
+
+    ui = TraceCompareUI(batch)
+    ui.page = max(1, min(page_num, ui.total_pages))
+    source.reply(ui.build())
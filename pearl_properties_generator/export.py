@@ -0,0 +1,186 @@
+import csv
+import json
+import math
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Sequence, TextIO, Tuple, Union
+
+from .generator import SettingResult
+
+FIELDS = [
+    "dest_x",
+    "dest_z",
+    "distance",
+    "x",
+    "y",
+    "z",
+    "tick",
+    "light_gray",
+    "dark_gray",
+    "total_tnt",
+    "direction",
+    "pitch",
+    "drift",
+    "bits",
+    "cannon",
+]
+
+
+def to_record(dest: Tuple[float, float], r: SettingResult) -> Dict[str, Any]:
+    return {
+        "dest_x": dest[0],
+        "dest_z": dest[1],
+        "distance": r.distance,
+        "x": r.position.x,
+        "y": r.position.y,
+        "z": r.position.z,
+        "tick": r.tick,
+        "light_gray": r.light_gray,
+        "dark_gray": r.dark_gray,
+        "total_tnt": r.total_tnt,
+        "direction": r.direction,
+        "pitch": r.pitch,
+        "drift": r.drift,
+        "bits": r.bits,
+        "cannon": r.cannon,
+    }
+
+
+class CsvWriter:
+    BINARY = False
+    EXTENSION = "csv"
+
+    def __init__(self, stream: TextIO, cannons: Sequence[str] = ()):
+        self.writer = csv.writer(stream)
+        self.writer.writerow(FIELDS)
+        self.count = 0
+
+    def write(self, dest: Tuple[float, float], results: Iterable[SettingResult]):
+        for r in results:
+            record = to_record(dest, r)
+            self.writer.writerow(["" if record[key] is None else record[key] for key in FIELDS])
+            self.count += 1
+
+    def close(self):
+        pass
+
+
+class JsonWriter:
+    BINARY = False
+    EXTENSION = "json"
+
+    def __init__(self, stream: TextIO, cannons: Sequence[str] = ()):
+        self.stream = stream
+        self.stream.write("[")
+        self.count = 0
+
+    def write(self, dest: Tuple[float, float], results: Iterable[SettingResult]):
+        for r in results:
+            self.stream.write(",\n" if self.count else "\n")
+            self.stream.write(json.dumps(to_record(dest, r), ensure_ascii=False))
+            self.count += 1
+
+    def close(self):
+        self.stream.write("\n]\n")
+
+
+class JsonLinesWriter:
+    BINARY = False
+    EXTENSION = "jsonl"
+
+    def __init__(self, stream: TextIO, cannons: Sequence[str] = ()):
+        self.stream = stream
+        self.count = 0
+
+    def write(self, dest: Tuple[float, float], results: Iterable[SettingResult]):
+        for r in results:
+            self.stream.write(json.dumps(to_record(dest, r), ensure_ascii=False))
+            self.stream.write("\n")
+            self.count += 1
+
+    def close(self):
+        pass
+
+
+class BinaryWriter:
+    BINARY = True
+    EXTENSION = "bin"
+    MAGIC = b"PPGR"
+    VERSION = 2
+    RECORD = struct.Struct("<ddddddiHHBBdH")
+    NO_CANNON = 0xFFFF
+
+    def __init__(self, stream: BinaryIO, cannons: Sequence[str] = ()):
+        if len(cannons) >= self.NO_CANNON:
+            raise ValueError(f"too many cannons for a binary export: {len(cannons)}")
+        self.stream = stream
+        self.cannons = {name: index for index, name in enumerate(cannons)}
+        self.stream.write(self.MAGIC + struct.pack("<HHH", self.VERSION, self.RECORD.size, len(cannons)))
+        for name in cannons:
+            encoded = name.encode("utf-8")
+            self.stream.write(struct.pack("<H", len(encoded)) + encoded)
+        self.count = 0
+
+    def cannon_index(self, name: Optional[str]) -> int:
+        if name is None:
+            return self.NO_CANNON
+        if name not in self.cannons:
+            raise ValueError(f"cannon {name!r} is missing from the binary export name table")
+        return self.cannons[name]
+
+    def write(self, dest: Tuple[float, float], results: Iterable[SettingResult]):
+        for r in results:
+            self.stream.write(self.RECORD.pack(
+                dest[0],
+                dest[1],
+                r.distance,
+                r.position.x,
+                r.position.y,
+                r.position.z,
+                r.tick,
+                r.light_gray,
+                r.dark_gray,
+                r.direction,
+                r.pitch,
+                math.nan if r.drift is None else r.drift,
+                self.cannon_index(r.cannon),
+            ))
+            self.count += 1
+
+    def close(self):
+        pass
+
+
+WRITERS = {
+    "csv": CsvWriter,
+    "json": JsonWriter,
+    "jsonl": JsonLinesWriter,
+    "bin": BinaryWriter,
+}
+
+
+def create_writer(fmt: str, stream: Union[TextIO, BinaryIO], cannons: Sequence[str] = ()):
+    return WRITERS[fmt](stream, cannons)
+
+
+def open_output(path: str, fmt: str) -> Union[TextIO, BinaryIO]:
+    if WRITERS[fmt].BINARY:
+        return open(path, "wb")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def export_results(
+    path: str,
+    fmt: str,
+    batches: Iterable[Tuple[Tuple[float, float], Iterable[SettingResult]]],
+    cannons: Sequence[str] = (),
+) -> int:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open_output(path, fmt) as stream:
+        writer = create_writer(fmt, stream, cannons)
+        for dest, results in batches:
+            writer.write(dest, results)
+        writer.close()
+    return writer.count
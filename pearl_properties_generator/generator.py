@@ -1,8 +1,23 @@
+import heapq
 import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import List
+from functools import lru_cache
+from itertools import islice, repeat
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from enum import Enum
 
+if TYPE_CHECKING:
+    from .cache import DependentCache
+    from .engines import Engine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class SortBy(Enum):
     DISTANCE = "distance"
@@ -10,6 +25,7 @@ class SortBy(Enum):
     TOTAL_TNT = "total_tnt"
     LIGHT_GRAY = "light_gray"
     DARK_GRAY = "dark_gray"
+    DRIFT = "drift"
 
 
 @dataclass
@@ -161,11 +177,11 @@ class Setting:
         
         return cls(amount_l, amount_r, direction, pitch)
 
-    def get_thrust(self) -> Vec3d:
+    def get_thrust(self, rotation: Optional[int] = None) -> Vec3d:
         thrust_l = Constant.THRUST[self.pitch] * self.amount_l
         thrust_r = Constant.THRUST[self.pitch] * self.amount_r
 
-        rot = Setting.rotation
+        rot = Setting.rotation if rotation is None else rotation
         d = self.direction
 
         thrust_l = Vec3d(
@@ -181,6 +197,18 @@ class Setting:
 
         return thrust_l + thrust_r
 
+    def get_base_thrust(self) -> Vec3d:
+        thrust_l = Constant.THRUST[self.pitch] * self.amount_l
+        thrust_r = Constant.THRUST[self.pitch] * self.amount_r
+        return Vec3d(thrust_l.x - thrust_r.x, thrust_l.y + thrust_r.y, thrust_l.z + thrust_r.z)
+
+    def get_base_angle(self) -> float:
+        thrust = Constant.THRUST[self.pitch]
+        return math.atan2(
+            thrust.z * self.amount_l + thrust.z * self.amount_r,
+            thrust.x * self.amount_l - thrust.x * self.amount_r,
+        )
+
     def to_bits(self) -> str:
         def qpow(a: int, b: int) -> int:
             ans = 1
@@ -223,6 +251,29 @@ class Setting:
         return f"[{a1} {b1}] [{a3} {b3}] [{ps} {a2} {ds} {b2}]"
 
 
+class Frame:
+    def __init__(self, rotation: int, direction: int):
+        sign_l = Constant.SIGN_L[rotation][direction]
+        sign_r = Constant.SIGN_R[rotation][direction]
+        self.xx = (sign_l[0] - sign_r[0]) // 2
+        self.xz = (sign_l[0] + sign_r[0]) // 2
+        self.zx = (sign_l[2] - sign_r[2]) // 2
+        self.zz = (sign_l[2] + sign_r[2]) // 2
+
+    def to_world(self, x: float, z: float) -> Tuple[float, float]:
+        return self.xx * x + self.xz * z, self.zx * x + self.zz * z
+
+    def to_base(self, x: float, z: float) -> Tuple[float, float]:
+        return self.xx * x + self.zx * z, self.xz * x + self.zz * z
+
+
+FRAMES = [[Frame(rotation, direction) for direction in range(4)] for rotation in range(4)]
+
+
+def get_frame(rotation: int, direction: int) -> Frame:
+    return FRAMES[rotation][direction]
+
+
 @dataclass
 class SettingResult:
     distance: float
@@ -234,6 +285,18 @@ class SettingResult:
     bits: str
     direction: int
     pitch: int
+    drift: Optional[float] = None
+    cannon: Optional[str] = None
+
+
+@dataclass
+class BaseResult:
+    distance: float
+    position: Vec3d
+    tick: int
+    amount_l: int
+    amount_r: int
+    pitch: int
 
 
 @dataclass
@@ -244,12 +307,262 @@ class TracePoint:
     momentum: Vec3d
 
 
+@dataclass
+class ChunkVisit:
+    chunk: Tuple[int, int]
+    enter_tick: int
+    exit_tick: int
+
+    def __str__(self) -> str:
+        return f"[{self.chunk[0]}, {self.chunk[1]}]"
+
+
+def sort_results(results: List[SettingResult], sort_by: SortBy):
+    if sort_by == SortBy.DISTANCE:
+        results.sort(key=lambda x: x.distance)
+    elif sort_by == SortBy.TICK:
+        results.sort(key=lambda x: x.tick)
+    elif sort_by == SortBy.TOTAL_TNT:
+        results.sort(key=lambda x: x.total_tnt)
+    elif sort_by == SortBy.LIGHT_GRAY:
+        results.sort(key=lambda x: x.light_gray)
+    elif sort_by == SortBy.DARK_GRAY:
+        results.sort(key=lambda x: x.dark_gray)
+    elif sort_by == SortBy.DRIFT:
+        results.sort(key=lambda x: math.inf if x.drift is None else x.drift)
+
+
+class ParetoFront:
+    def __init__(self):
+        self.levels: Dict[int, Tuple[List[float], List[int], List[Any]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(distances) for distances, _, _ in self.levels.values())
+
+    def dominated(self, distance: float, tick: int, total_tnt: int) -> bool:
+        for level_tick, (distances, totals, _) in self.levels.items():
+            if level_tick > tick:
+                continue
+            idx = bisect_right(distances, distance) - 1
+            if idx >= 0 and totals[idx] <= total_tnt:
+                return True
+        return False
+
+    def add(self, result: Any, distance: float, tick: int, total_tnt: int) -> bool:
+        if self.dominated(distance, tick, total_tnt):
+            return False
+
+        for level_tick, (distances, totals, results) in self.levels.items():
+            if level_tick < tick:
+                continue
+            lo = bisect_left(distances, distance)
+            hi = lo
+            while hi < len(distances) and totals[hi] >= total_tnt:
+                hi += 1
+            if lo < hi:
+                del distances[lo:hi]
+                del totals[lo:hi]
+                del results[lo:hi]
+
+        distances, totals, results = self.levels.setdefault(tick, ([], [], []))
+        idx = bisect_left(distances, distance)
+        distances.insert(idx, distance)
+        totals.insert(idx, total_tnt)
+        results.insert(idx, result)
+        return True
+
+    def results(self) -> List[Any]:
+        return [result for _, _, results in self.levels.values() for result in results]
+
+
+@lru_cache(maxsize=8)
+def get_scale(max_tick: int) -> List[float]:
+    scale = [0.0]
+    factor = 1.0
+    for _ in range(max_tick):
+        scale.append(scale[-1] + factor)
+        factor *= 0.99
+    return scale
+
+
+class LandingTable:
+    DEPENDS_ON = ("max_tnt", "max_tick")
+
+    def __init__(self, ground: float, max_tick: int, max_tnt: int, ticks: Optional[List[Any]] = None):
+        self.ground = ground
+        self.max_tick = max_tick
+        self.max_tnt = max_tnt
+        self.scale = get_scale(max_tick)
+        self.ticks = ticks if ticks is not None else [self._sweep(pitch) for pitch in range(2)]
+
+    def to_bytes(self) -> bytes:
+        return b"".join(array("i", ticks).tobytes() for ticks in self.ticks)
+
+    @classmethod
+    def from_buffer(cls, ground: float, max_tick: int, max_tnt: int, buffer: Any) -> "LandingTable":
+        ticks = memoryview(buffer).cast("B").cast("i")
+        size = 2 * max_tnt + 1
+        return cls(ground, max_tick, max_tnt, [ticks[:size], ticks[size:2 * size]])
+
+    def height(self, pitch: int, total_tnt: float, tick: int) -> float:
+        y0 = Constant.DELTA_POSITION[pitch].y
+        vy0 = Constant.MOTION[pitch].y + Constant.THRUST[pitch].y * total_tnt
+        return y0 + (vy0 + 3) * self.scale[tick] - 3 * tick
+
+    def _sweep(self, pitch: int) -> List[int]:
+        ticks = [0] * (2 * self.max_tnt + 1)
+        totals = range(2 * self.max_tnt + 1)
+        if Constant.THRUST[pitch].y < 0:
+            totals = reversed(totals)
+
+        tick = 1
+        for total_tnt in totals:
+            if self.max_tick < 1 or self.height(pitch, total_tnt, 1) < self.ground:
+                continue
+            while tick < self.max_tick and self.height(pitch, total_tnt, tick + 1) >= self.ground:
+                tick += 1
+            ticks[total_tnt] = tick
+        return ticks
+
+    def _solve(self, pitch: int, total_tnt: int) -> int:
+        if self.max_tick < 1 or self.height(pitch, total_tnt, 1) < self.ground:
+            return 0
+
+        lo, hi = 1, self.max_tick
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.height(pitch, total_tnt, mid) >= self.ground:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def landing_tick(self, pitch: int, total_tnt: int) -> int:
+        if 0 <= total_tnt < len(self.ticks[pitch]):
+            return self.ticks[pitch][total_tnt]
+        return self._solve(pitch, max(0, total_tnt))
+
+
+def get_drifts(results: List[SettingResult], perturbation: int, table: LandingTable) -> List[float]:
+    scale = table.scale
+    max_tnt = table.max_tnt
+    offsets = [
+        (dl, dr)
+        for dl in range(-perturbation, perturbation + 1)
+        for dr in range(-perturbation, perturbation + 1)
+        if dl or dr
+    ]
+
+    if np is None:
+        drifts = []
+        for r in results:
+            t = Constant.THRUST[r.pitch].x
+            s_0 = scale[table.landing_tick(r.pitch, r.total_tnt)]
+            x_0 = (t * r.light_gray - t * r.dark_gray) * s_0
+            z_0 = (t * r.light_gray + t * r.dark_gray) * s_0
+            drift = 0.0
+            for dl, dr in offsets:
+                a, b = r.light_gray + dl, r.dark_gray + dr
+                if not (0 <= a <= max_tnt and 0 <= b <= max_tnt):
+                    continue
+                s_n = scale[table.landing_tick(r.pitch, a + b)]
+                drift = max(drift, math.hypot((t * a - t * b) * s_n - x_0, (t * a + t * b) * s_n - z_0))
+            drifts.append(drift)
+        return drifts
+
+    if not results:
+        return []
+
+    scale = np.asarray(scale)
+    ticks = np.asarray(table.ticks)
+    thrust = np.array([Constant.THRUST[p].x for p in range(2)])
+
+    pitch = np.array([r.pitch for r in results])
+    a_0 = np.array([r.light_gray for r in results])
+    b_0 = np.array([r.dark_gray for r in results])
+    t = thrust[pitch]
+    s_0 = scale[ticks[pitch, a_0 + b_0]]
+    x_0 = (t * a_0 - t * b_0) * s_0
+    z_0 = (t * a_0 + t * b_0) * s_0
+
+    dl, dr = np.array(offsets).reshape(-1, 2).T
+    a = a_0[:, None] + dl[None, :]
+    b = b_0[:, None] + dr[None, :]
+    valid = (a >= 0) & (a <= max_tnt) & (b >= 0) & (b <= max_tnt)
+    total = np.where(valid, a + b, 0)
+    s_n = scale[ticks[pitch[:, None], total]]
+    t = t[:, None]
+    drift = np.hypot((t * a - t * b) * s_n - x_0[:, None], (t * a + t * b) * s_n - z_0[:, None])
+    return np.where(valid, drift, 0.0).max(axis=1, initial=0.0).tolist()
+
+
 def get_chunk_string(pos: Vec3d) -> str:
     x = int(math.floor(pos.x / 16))
     z = int(math.floor(pos.z / 16))
     return f"[{x}, {z}]"
 
 
+class TrajectorySummaries:
+    ROW = 15
+
+    def __init__(self):
+        self.index: Dict[int, int] = {}
+        self.rows = array("d")
+        self.positions = array("d")
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @staticmethod
+    def get_key(setting: "Setting") -> int:
+        return (setting.amount_l << 21 | setting.amount_r) << 1 | setting.pitch
+
+    def get(self, key: int) -> Optional[int]:
+        return self.index.get(key)
+
+    def put(self, key: int, result: Optional[BaseResult], complete: bool, segment: "Segment"):
+        start, positions, state = segment
+        if result is None:
+            row = (0, complete, start, 0, len(positions), 0.0, 0.0, 0.0, 0.0, *state)
+        else:
+            position = result.position
+            row = (
+                result.tick, complete, start, 0, len(positions),
+                result.distance, position.x, position.y, position.z, *state,
+            )
+
+        with self.lock:
+            offset = len(self.positions)
+            self.positions.extend(positions)
+            idx = self.index.setdefault(key, len(self.rows) // self.ROW)
+            if idx * self.ROW == len(self.rows):
+                self.rows.extend(row)
+            else:
+                self.rows[idx * self.ROW:(idx + 1) * self.ROW] = array("d", row)
+            self.rows[idx * self.ROW + 3] = offset
+
+    def tick(self, idx: int) -> int:
+        return int(self.rows[idx * self.ROW])
+
+    def is_complete(self, idx: int) -> bool:
+        return self.rows[idx * self.ROW + 1] != 0
+
+    def result(self, idx: int, setting: "Setting") -> BaseResult:
+        row = idx * self.ROW
+        distance, x, y, z = self.rows[row + 5:row + 9]
+        return BaseResult(distance, Vec3d(x, y, z), self.tick(idx), setting.amount_l, setting.amount_r, setting.pitch)
+
+    def segment(self, idx: int) -> "Segment":
+        row = idx * self.ROW
+        start, offset, length = self.rows[row + 2:row + 5]
+        offset = int(offset)
+        return int(start), self.positions[offset:offset + int(length)], self.rows[row + 9:row + 15]
+
+
+Segment = Tuple[int, Any, Any]
+
+
 class TraceSimulator:
     def __init__(
         self,
@@ -259,6 +572,8 @@ class TraceSimulator:
         rotation: int,
         ground_y: float,
         max_tick: int,
+        landing_table: Optional["LandingTable"] = None,
+        engine: Optional["Engine"] = None,
     ):
         self.pearl_x = pearl_x
         self.pearl_z = pearl_z
@@ -266,10 +581,17 @@ class TraceSimulator:
         self.rotation = rotation
         self.ground_y = ground_y
         self.max_tick = max_tick
+        self.landing_table = landing_table
+        self.engine = engine
         
         Setting.rotation = rotation
 
     def simulate(self, bits: str) -> List[TracePoint]:
+        if self.engine is not None:
+            return self.engine.trace(self, [bits]).trace(0)
+        return self.simulate_scalar(bits)
+
+    def simulate_scalar(self, bits: str) -> List[TracePoint]:
         try:
             setting = Setting.from_bits(bits)
         except ValueError:
@@ -281,7 +603,7 @@ class TraceSimulator:
             Constant.MOTION[setting.pitch].y,
             Constant.MOTION[setting.pitch].z
         ))
-        pearl.accelerate(setting.get_thrust())
+        pearl.accelerate(setting.get_thrust(self.rotation))
         
         results = []
         for tick in range(self.max_tick):
@@ -297,8 +619,176 @@ class TraceSimulator:
         
         return results
 
+    def _last_tick(self, setting: Setting) -> int:
+        if self.player_y + Constant.DELTA_POSITION[setting.pitch].y < self.ground_y:
+            return -1
+        if self.landing_table is None:
+            self.landing_table = LandingTable(self.ground_y - self.player_y, self.max_tick, 0)
+        landing_tick = self.landing_table.landing_tick(setting.pitch, setting.amount_l + setting.amount_r)
+        return min(landing_tick, self.max_tick - 1)
+
+    def chunk_visits(self, bits: str) -> List[ChunkVisit]:
+        try:
+            setting = Setting.from_bits(bits)
+        except ValueError:
+            return []
+
+        last_tick = self._last_tick(setting)
+        if last_tick < 0:
+            return []
+
+        scale = get_scale(self.max_tick)
+        thrust = setting.get_thrust(self.rotation)
+        mx = Constant.MOTION[setting.pitch].x + thrust.x
+        mz = Constant.MOTION[setting.pitch].z + thrust.z
+
+        def chunk_at(tick: int) -> Tuple[int, int]:
+            return (
+                math.floor((self.pearl_x + mx * scale[tick]) / 16),
+                math.floor((self.pearl_z + mz * scale[tick]) / 16),
+            )
+
+        first, last = chunk_at(0), chunk_at(last_tick)
+        if abs(last[0] - first[0]) + abs(last[1] - first[1]) >= last_tick:
+            ticks = [
+                tick for tick in range(1, last_tick + 1)
+                if chunk_at(tick) != chunk_at(tick - 1)
+            ]
+        else:
+            ticks = self._chunk_crossings(chunk_at, first, last, last_tick, mx, mz, scale)
+
+        visits = []
+        enter_tick = 0
+        for tick in ticks + [last_tick + 1]:
+            visits.append(ChunkVisit(chunk_at(enter_tick), enter_tick, tick - 1))
+            enter_tick = tick
+        return visits
+
+    def _chunk_crossings(
+        self,
+        chunk_at: Callable[[int], Tuple[int, int]],
+        first: Tuple[int, int],
+        last: Tuple[int, int],
+        last_tick: int,
+        mx: float,
+        mz: float,
+        scale: List[float],
+    ) -> List[int]:
+        ticks = set()
+        for axis, origin, momentum in ((0, self.pearl_x, mx), (1, self.pearl_z, mz)):
+            start, end = first[axis], last[axis]
+            step = 1 if end > start else -1
+            for c in range(start, end, step):
+                boundary = 16 * (c + 1) if step > 0 else 16 * c
+                tick = bisect_left(scale, (boundary - origin) / momentum, 0, last_tick + 1)
+                tick = max(1, min(tick, last_tick))
+                while tick > 1 and (chunk_at(tick - 1)[axis] - c) * step > 0:
+                    tick -= 1
+                while (chunk_at(tick)[axis] - c) * step <= 0:
+                    tick += 1
+                ticks.add(tick)
+        return sorted(ticks)
+
+    def simulate_batch(self, bits_list: List[str]) -> "TraceBatch":
+        if self.engine is not None:
+            return self.engine.trace(self, bits_list)
+        if np is None:
+            return self.simulate_batch_scalar(bits_list)
+        return self.simulate_batch_numpy(bits_list)
+
+    def simulate_batch_scalar(self, bits_list: List[str]) -> "TraceBatch":
+        traces = [self.simulate_scalar(bits) for bits in bits_list]
+        history = [[None] * len(traces) for _ in range(max(map(len, traces), default=0))]
+        for i, trace in enumerate(traces):
+            for t in trace:
+                history[t.tick][i] = (
+                    t.position.x, t.position.y, t.position.z,
+                    t.momentum.x, t.momentum.y, t.momentum.z,
+                )
+        return TraceBatch(bits_list, history, [len(trace) for trace in traces])
+
+    def simulate_batch_numpy(self, bits_list: List[str]) -> "TraceBatch":
+        settings = []
+        for bits in bits_list:
+            try:
+                settings.append(Setting.from_bits(bits))
+            except ValueError:
+                settings.append(None)
+
+        state = np.array([
+            [
+                self.pearl_x,
+                self.player_y + Constant.DELTA_POSITION[s.pitch].y,
+                self.pearl_z,
+                Constant.MOTION[s.pitch].x + thrust.x,
+                Constant.MOTION[s.pitch].y + thrust.y,
+                Constant.MOTION[s.pitch].z + thrust.z,
+            ]
+            if s is not None else [0.0, self.ground_y - 1, 0.0, 0.0, 0.0, 0.0]
+            for s, thrust in ((s, s.get_thrust(self.rotation) if s is not None else None) for s in settings)
+        ]).reshape(-1, 6)
+
+        history = []
+        lengths = np.zeros(len(settings), dtype=np.int64)
+        active = np.ones(len(settings), dtype=bool)
+        for _ in range(self.max_tick):
+            active &= state[:, 1] >= self.ground_y
+            if not active.any():
+                break
+            lengths += active
+            history.append(state.copy())
+            state[:, :3] += state[:, 3:]
+            state[:, 3:] *= 0.99
+            state[:, 4] -= 0.03
+
+        return TraceBatch(bits_list, history, lengths.tolist())
+
+
+class TraceBatch:
+    def __init__(self, bits_list: List[str], history: List[Any], lengths: List[int]):
+        self.bits_list = bits_list
+        self.history = history
+        self.lengths = lengths
+
+    def __len__(self) -> int:
+        return len(self.bits_list)
+
+    @property
+    def max_length(self) -> int:
+        return max(self.lengths, default=0)
+
+    def landing_tick(self, index: int) -> int:
+        return self.lengths[index] - 1
+
+    def point(self, index: int, tick: int) -> Optional[TracePoint]:
+        if not 0 <= tick < self.lengths[index]:
+            return None
+        x, y, z, mx, my, mz = (float(v) for v in self.history[tick][index])
+        return TracePoint(
+            tick=tick,
+            chunk=f"[{math.floor(x / 16)}, {math.floor(z / 16)}]",
+            position=Vec3d(x, y, z),
+            momentum=Vec3d(mx, my, mz),
+        )
+
+    def trace(self, index: int) -> List[TracePoint]:
+        return [self.point(index, tick) for tick in range(self.lengths[index])]
+
 
 class PearlPropertiesGenerator:
+    SEARCH_MODES = ("exhaustive", "coarse", "solver", "adaptive", "pareto")
+    COARSE_STEP = 10
+    SOLVER_RADIUS = 2
+    SEGMENT_TICKS = 4
+    RETARGET_EPSILON = 1e-9
+    ADAPTIVE_MIN_SCALE = 0.125
+    ADAPTIVE_MAX_SCALE = 4.0
+    PARETO_CHUNK = 1024
+    NEAR_MAX_RESULTS = 10000
+    CANDIDATE_DEPENDS_ON = ("max_tnt",)
+    RESULT_DEPENDS_ON = CANDIDATE_DEPENDS_ON + ("max_tick", "engine")
+    TRAJECTORY_DEPENDS_ON = ("max_tick", "engine")
+
     def __init__(
         self,
         pearl_x: float,
@@ -311,6 +801,13 @@ class PearlPropertiesGenerator:
         dest_x: float,
         dest_z: float,
         max_results: int = 100,
+        candidate_cache: Optional["DependentCache"] = None,
+        result_cache: Optional["DependentCache"] = None,
+        search_mode: str = "exhaustive",
+        pareto_tolerance: float = 1.0,
+        landing_table: Optional["LandingTable"] = None,
+        trajectory_cache: Optional["DependentCache"] = None,
+        engine: Optional["Engine"] = None,
     ):
         self.pearl_x = pearl_x
         self.pearl_z = pearl_z
@@ -318,34 +815,39 @@ class PearlPropertiesGenerator:
         self.rotation = rotation
         self.max_tnt = max_tnt
         self.ground_y = ground_y
+        self.ground = ground_y - player_y
         self.max_tick = max_tick
         self.dest_x = dest_x
         self.dest_z = dest_z
         self.max_results = max_results
+        self.candidate_cache = candidate_cache
+        self.result_cache = result_cache
+        self.search_mode = search_mode
+        self.pareto_tolerance = pareto_tolerance
+        self.simulated = 0
+        self.window_width = 0.0
+        self.landing_table = landing_table
+        self.trajectory_cache = trajectory_cache
+        self.engine = engine
+        self.summaries: Dict[Tuple[float, float], TrajectorySummaries] = {}
+        self.sources: Dict[Tuple[float, float], TrajectorySummaries] = {}
+        self.replayed = 0
+        self.admitted: Dict[Tuple[float, float], Tuple[Tuple[float, float], List[Setting]]] = {}
 
         Setting.rotation = rotation
 
-    def _get_pearl(self, pitch: int) -> Pearl:
-        pos = Vec3d(self.pearl_x, self.player_y, self.pearl_z) + Constant.DELTA_POSITION[pitch]
+    def _get_base_pearl(self, pitch: int) -> Pearl:
+        pos = Vec3d(0, 0, 0) + Constant.DELTA_POSITION[pitch]
         return Pearl(pos, Vec3d(Constant.MOTION[pitch].x, Constant.MOTION[pitch].y, Constant.MOTION[pitch].z))
 
     def _intersect(self, a1: float, a2: float, b1: float, b2: float) -> bool:
         return max(a1, b1) < min(a2, b2)
 
-    def _in_range(self, direction: int, angle: float, delta: float) -> bool:
-        s1 = Setting(0, 1, direction, 0)
-        s2 = Setting(1, 0, direction, 0)
-        a1 = s1.get_thrust().angle()
-        a2 = s2.get_thrust().angle()
-
-        if a2 < a1:
-            a1, a2 = a2, a1
+    def _in_range(self, angle: float, delta: float) -> bool:
+        a1 = Setting(1, 0).get_base_angle()
+        a2 = Setting(0, 1).get_base_angle()
 
         pi = math.pi
-        if abs(a2 - a1) > pi:
-            a1 += 2 * pi
-            a1, a2 = a2, a1
-
         b1 = angle - delta
         b2 = angle + delta
 
@@ -355,101 +857,689 @@ class PearlPropertiesGenerator:
             or self._intersect(a1, a2, b1 + 2 * pi, b2 + 2 * pi)
         )
 
-    def generate(self, sort_by: SortBy = SortBy.DISTANCE) -> List[SettingResult]:
+    def get_base_destination(self, direction: int) -> Tuple[Tuple[float, float], bool]:
+        frame = get_frame(self.rotation, direction)
+        x, z = frame.to_base(self.dest_x - self.pearl_x, self.dest_z - self.pearl_z)
+        if x < 0:
+            return (-x, z), True
+        return (x, z), False
+
+    def _window_start(self, i: int, a1: float) -> int:
+        lo, hi = 0, self.max_tnt + 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if Setting(i, mid, 0, 0).get_base_angle() > a1:
+                hi = mid
+            else:
+                lo = mid + 1
+        return max(0, lo - 2)
+
+    def get_landing_table(self) -> LandingTable:
+        if self.landing_table is None:
+            self.landing_table = LandingTable(self.ground, self.max_tick, self.max_tnt)
+        return self.landing_table
+
+    def _landing_tick(self, pitch: int, total_tnt: int) -> int:
+        return self.get_landing_table().landing_tick(pitch, total_tnt)
+
+    def _lower_bound(self, cell: Tuple[int, int, int], base_dest: Tuple[float, float]) -> float:
+        pitch, cell_l, cell_r = cell
+        step = self.COARSE_STEP
+        amount_l = cell_l * step + (step - 1) / 2
+        amount_r = cell_r * step + (step - 1) / 2
+        total_min = (cell_l + cell_r) * step
+        total_max = total_min + 2 * (step - 1)
+
+        max_tick = max(self._landing_tick(pitch, total_min), self._landing_tick(pitch, total_max))
+        if max_tick == 0:
+            return math.inf
+        max_tick = min(max_tick + 1, self.max_tick)
+
+        t = Constant.THRUST[pitch].x
+        vx = t * amount_l - t * amount_r
+        vz = t * amount_l + t * amount_r
+        slack = t * (step - 1)
+        dest_x, dest_z = base_dest
+        scale = get_scale(self.max_tick)
+
+        def bound(n: int) -> float:
+            return math.hypot(vx * scale[n] - dest_x, vz * scale[n] - dest_z) - slack * scale[n]
+
+        lo, hi = 1, max_tick
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bound(mid + 1) >= bound(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+
+        return max(0.0, bound(lo)) - 1e-6
+
+    def _in_window(self, setting: Setting, a1: float, a2: float) -> bool:
         pi = math.pi
+        thrust_angle = setting.get_base_angle()
+        return (
+            (a1 < thrust_angle < a2)
+            or (a1 < thrust_angle + 2 * pi < a2)
+            or (a1 < thrust_angle - 2 * pi < a2)
+        )
 
-        pearl0 = self._get_pearl(0)
-        vec = Vec3d(self.dest_x, pearl0.get_y(), self.dest_z) - pearl0.get_position()
-        angle = vec.angle()
-        delta = 10.0 / self.max_tnt
+    def solve(self, base_dest: Tuple[float, float]) -> List[Setting]:
+        dest_x, dest_z = base_dest
+        angle = math.atan2(dest_z, dest_x)
+        delta = self.get_window()
         a1 = angle - delta
         a2 = angle + delta
 
-        results = []
+        candidates = []
+
+        if not self._in_range(angle, delta):
+            return candidates
+
+        radius = self.SOLVER_RADIUS
+        scale = get_scale(self.max_tick)
+        seen = set()
+
+        for p in range(2):
+            t = Constant.THRUST[p].x
+            for n in range(1, self.max_tick + 1):
+                vx = dest_x / scale[n]
+                vz = dest_z / scale[n]
+                amount_l = (vx + vz) / (2 * t)
+                amount_r = (vz - vx) / (2 * t)
+
+                if not (-radius < amount_l < self.max_tnt + radius and -radius < amount_r < self.max_tnt + radius):
+                    continue
+                if self._landing_tick(p, max(0, round(amount_l + amount_r))) + radius < n:
+                    continue
+
+                base_l = math.floor(amount_l)
+                base_r = math.floor(amount_r)
+                for i in range(max(0, base_l - radius + 1), min(self.max_tnt, base_l + radius) + 1):
+                    for j in range(max(0, base_r - radius + 1), min(self.max_tnt, base_r + radius) + 1):
+                        if (i, j, p) in seen:
+                            continue
+                        seen.add((i, j, p))
+                        setting = Setting(i, j, 0, p)
+                        if self._in_window(setting, a1, a2):
+                            candidates.append(setting)
 
-        for d in range(4):
-            if not self._in_range(d, angle, delta):
+        return candidates
+
+    def get_window(self) -> float:
+        return 10.0 / self.max_tnt
+
+    def candidates(self, base_dest: Tuple[float, float], delta: Optional[float] = None) -> List[Setting]:
+        angle = math.atan2(base_dest[1], base_dest[0])
+        if delta is None:
+            delta = self.get_window()
+
+        if not self._in_range(angle, delta):
+            return []
+
+        return self._candidates_between(angle - delta, angle + delta)
+
+    def _candidates_between(self, a1: float, a2: float) -> List[Setting]:
+        pi = math.pi
+        candidates = []
+
+        for i in range(self.max_tnt + 1):
+            flag_success = False
+            flag_break = False
+
+            j = self._window_start(i, a1)
+            while not flag_break and j <= self.max_tnt:
+                for p in range(2):
+                    if flag_break:
+                        break
+
+                    s = Setting(i, j, 0, p)
+                    thrust_angle = s.get_base_angle()
+
+                    in_angle_range = (
+                        (a1 < thrust_angle < a2)
+                        or (a1 < thrust_angle + 2 * pi < a2)
+                        or (a1 < thrust_angle - 2 * pi < a2)
+                    )
+
+                    if not in_angle_range:
+                        if flag_success or thrust_angle >= a2:
+                            flag_break = True
+                        continue
+
+                    flag_success = True
+                    candidates.append(s)
+                j += 1
+
+        return candidates
+
+    def get_neighbour(self, base_dest: Tuple[float, float], entries: List[Tuple[Any, Any]]) -> Optional[Tuple[Any, Any]]:
+        angle = math.atan2(base_dest[1], base_dest[0])
+        delta = self.get_window()
+        best = None
+        best_distance = math.inf
+        for dest, value in entries:
+            if dest == base_dest or abs(math.atan2(dest[1], dest[0]) - angle) >= delta:
                 continue
+            distance = math.hypot(dest[0] - base_dest[0], dest[1] - base_dest[1])
+            if distance < best_distance:
+                best, best_distance = (dest, value), distance
+        return best
+
+    def get_summaries(self, base_dest: Tuple[float, float]) -> TrajectorySummaries:
+        cache = self.trajectory_cache
+        summaries = cache.get(base_dest) if cache is not None else self.summaries.get(base_dest)
+        if summaries is None:
+            entries = cache.items() if cache is not None else list(self.summaries.items())
+            neighbour = self.get_neighbour(base_dest, entries)
+            if neighbour is not None:
+                self.sources[base_dest] = neighbour[1]
+            summaries = TrajectorySummaries()
+            if cache is not None:
+                cache.put(base_dest, summaries)
+            else:
+                self.summaries[base_dest] = summaries
+        return summaries
+
+    def simulate(
+        self,
+        s: Setting,
+        base_dest: Tuple[float, float],
+        resume: Optional[Tuple[int, Pearl, float, Vec3d, int, int, List[Vec3d]]] = None,
+    ) -> Tuple[Optional[BaseResult], bool, Segment]:
+        dest_x, dest_z = base_dest
+        if resume is None:
+            pearl = self._get_base_pearl(s.pitch)
+            pearl.accelerate(s.get_base_thrust())
+            start, mn, best_pos, best_tick, trace_start, trace = 0, 1e10, pearl.get_position(), -1, 0, []
+        else:
+            start, pearl, mn, best_pos, best_tick, trace_start, trace = resume
+
+        complete = True
+
+        for tick in range(start, self.max_tick):
+            pearl.tick()
+            trace.append(pearl.position)
+            if pearl.get_y() < self.ground:
+                complete = False
+                break
 
-            for i in range(self.max_tnt + 1):
-                flag_success = False
-                flag_break = False
+            dis = pearl.get_position().distance(
+                Vec3d(dest_x, pearl.get_y(), dest_z)
+            )
+
+            if dis < mn:
+                mn = dis
+                best_pos = Vec3d(
+                    pearl.get_position().x,
+                    pearl.get_position().y,
+                    pearl.get_position().z,
+                )
+                best_tick = tick + 1
+            else:
+                break
 
-                j = 0
-                while not flag_break and j <= self.max_tnt:
-                    for p in range(2):
-                        if flag_break:
-                            break
+        if len(trace) > self.SEGMENT_TICKS:
+            trace_start += len(trace) - self.SEGMENT_TICKS
+            trace = trace[-self.SEGMENT_TICKS:]
+        position, momentum = pearl.position, pearl.momentum
+        segment = (
+            trace_start,
+            [c for p in trace for c in (p.x, p.y, p.z)],
+            (position.x, position.y, position.z, momentum.x, momentum.y, momentum.z),
+        )
 
-                        s = Setting(i, j, d, p)
-                        thrust_angle = s.get_thrust().angle()
+        if mn == 1e10:
+            return None, complete, segment
+        return BaseResult(
+            distance=mn,
+            position=best_pos,
+            tick=best_tick,
+            amount_l=s.amount_l,
+            amount_r=s.amount_r,
+            pitch=s.pitch,
+        ), complete, segment
+
+    def simulate_many(
+        self, settings: List[Setting], base_dest: Tuple[float, float]
+    ) -> List[Tuple[Optional[BaseResult], bool, Segment]]:
+        if self.engine is not None:
+            return self.engine.simulate(self, settings, base_dest)
+        return [self.simulate(s, base_dest) for s in settings]
+
+    def replay(
+        self, s: Setting, base_dest: Tuple[float, float], segment: Segment, landing_tick: int
+    ) -> Optional[Tuple[Optional[BaseResult], bool, Segment]]:
+        start, positions, state = segment
+        if start > landing_tick:
+            return None
+
+        dest_x, dest_z = base_dest
+        mn = 1e10
+        best = None
+        best_tick = -1
+        tick = start
+        complete = None
+
+        coords = iter(positions)
+        for x, y, z in zip(coords, coords, coords):
+            tick += 1
+            if y < self.ground:
+                complete = False
+                break
 
-                        in_angle_range = (
-                            (a1 < thrust_angle < a2)
-                            or (a1 < thrust_angle + 2 * pi < a2)
-                            or (a1 < thrust_angle - 2 * pi < a2)
-                        )
+            dx = x - dest_x
+            dz = z - dest_z
+            dis = math.sqrt(dx * dx + dz * dz)
+            if dis < mn:
+                mn = dis
+                best = (x, y, z)
+                best_tick = tick
+            else:
+                complete = True
+                break
 
-                        if not in_angle_range:
-                            if flag_success:
-                                flag_break = True
+        if complete is None:
+            trace = [Vec3d(*positions[i:i + 3]) for i in range(0, len(positions), 3)]
+            pearl = Pearl(Vec3d(*state[:3]), Vec3d(*state[3:]))
+            best_pos = pearl.get_position() if best is None else Vec3d(*best)
+            result, complete, segment = self.simulate(
+                s, base_dest, (tick, pearl, mn, best_pos, best_tick, start, trace)
+            )
+            if start > 0 and (result is None or result.tick <= start + 1):
+                return None
+            return result, complete, segment
+
+        if start > 0 and best_tick <= start + 1:
+            return None
+        if best is None:
+            return None, complete, segment
+        return BaseResult(mn, Vec3d(*best), best_tick, s.amount_l, s.amount_r, s.pitch), complete, segment
+
+    def _truncate(self, s: Setting, base_dest: Tuple[float, float], tick: int) -> BaseResult:
+        thrust = s.get_base_thrust()
+        scale = get_scale(self.max_tick)[tick]
+        x = Constant.DELTA_POSITION[s.pitch].x + (Constant.MOTION[s.pitch].x + thrust.x) * scale
+        z = Constant.DELTA_POSITION[s.pitch].z + (Constant.MOTION[s.pitch].z + thrust.z) * scale
+        y = self.get_landing_table().height(s.pitch, s.amount_l + s.amount_r, tick)
+        distance = math.hypot(x - base_dest[0], z - base_dest[1])
+        return BaseResult(distance, Vec3d(x, y, z), tick, s.amount_l, s.amount_r, s.pitch)
+
+    def retarget(
+        self, base_dest: Tuple[float, float], old_dest: Tuple[float, float], old_candidates: List[Setting]
+    ) -> Tuple[List[Setting], List[Setting]]:
+        delta = self.get_window()
+        angle = math.atan2(base_dest[1], base_dest[0])
+        old_angle = math.atan2(old_dest[1], old_dest[0])
+        if not self._in_range(angle, delta):
+            return [], []
+
+        a1, a2 = angle - delta, angle + delta
+        b1, b2 = old_angle - delta, old_angle + delta
+        candidates = [s for s in old_candidates if self._in_window(s, a1, a2)]
+        added = []
+        for lo, hi in ((a1, min(a2, b1)), (max(a1, b2), a2)):
+            if lo >= hi:
+                continue
+            for s in self._candidates_between(lo - self.RETARGET_EPSILON, hi + self.RETARGET_EPSILON):
+                if self._in_window(s, a1, a2) and not self._in_window(s, b1, b2):
+                    added.append(s)
+
+        candidates.extend(added)
+        candidates.sort(key=TrajectorySummaries.get_key)
+        return candidates, added
+
+    def retarget_search(self, base_dest: Tuple[float, float], candidates: List[Setting]) -> List[BaseResult]:
+        _, added = self.admitted[base_dest]
+        get_key = TrajectorySummaries.get_key
+        best = []
+
+        def push(results: List[BaseResult]):
+            for result in results:
+                item = (-result.distance, -get_key(result), result)
+                if len(best) < self.max_results:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+
+        push(self.evaluate(added, base_dest))
+
+        distance = math.hypot(*base_dest)
+        angle = math.atan2(base_dest[1], base_dest[0])
+        added_keys = {get_key(s) for s in added}
+        kept = sorted(
+            (distance * math.sin(min(abs(s.get_base_angle() - angle), math.pi / 2)) - 1e-6, get_key(s), s)
+            for s in candidates
+            if get_key(s) not in added_keys
+        )
+
+        for start in range(0, len(kept), self.PARETO_CHUNK):
+            if len(best) >= self.max_results and -best[0][0] < kept[start][0]:
+                break
+            push(self.evaluate([item[2] for item in kept[start:start + self.PARETO_CHUNK]], base_dest))
+
+        best.sort(reverse=True)
+        return [item[2] for item in best]
+
+    def get_candidates(self, base_dest: Tuple[float, float]) -> List[Setting]:
+        cache = self.candidate_cache
+        if cache is None:
+            return self.candidates(base_dest)
+
+        candidates = cache.get(base_dest)
+        if candidates is None:
+            neighbour = self.get_neighbour(base_dest, cache.items())
+            if neighbour is None:
+                candidates = self.candidates(base_dest)
+            else:
+                candidates, added = self.retarget(base_dest, *neighbour)
+                self.admitted[base_dest] = (neighbour[0], added)
+            cache.put(base_dest, candidates)
+        return candidates
+
+    def evaluate(self, candidates: List[Setting], base_dest: Tuple[float, float]) -> List[BaseResult]:
+        if not candidates:
+            return []
+
+        summaries = self.get_summaries(base_dest)
+        source = self.sources.get(base_dest)
+        results: List[Optional[BaseResult]] = []
+        pending = []
+
+        for s in candidates:
+            landing_tick = self._landing_tick(s.pitch, s.amount_l + s.amount_r)
+            simulation = None
+            key = TrajectorySummaries.get_key(s)
+            idx = summaries.get(key)
+            if idx is not None:
+                tick = summaries.tick(idx)
+                if landing_tick == 0:
+                    continue
+                if landing_tick < tick:
+                    results.append(self._truncate(s, base_dest, landing_tick))
+                    continue
+                if tick > 0 and (landing_tick == tick or summaries.is_complete(idx)):
+                    results.append(summaries.result(idx, s))
+                    continue
+                simulation = self.replay(s, base_dest, summaries.segment(idx), landing_tick)
+            elif source is not None:
+                idx = source.get(key)
+                if idx is not None:
+                    simulation = self.replay(s, base_dest, source.segment(idx), landing_tick)
+
+            if simulation is None:
+                pending.append((len(results), key, s))
+                results.append(None)
+                continue
+
+            self.replayed += 1
+            result, complete, segment = simulation
+            summaries.put(key, result, complete, segment)
+            results.append(result)
+
+        if pending:
+            self.simulated += len(pending)
+            simulations = self.simulate_many([s for _, _, s in pending], base_dest)
+            for (i, key, _), (result, complete, segment) in zip(pending, simulations):
+                summaries.put(key, result, complete, segment)
+                results[i] = result
+
+        return [result for result in results if result is not None]
+
+    def coarse_search(self, base_dest: Tuple[float, float]) -> List[BaseResult]:
+        cells: Dict[Tuple[int, int, int], List[Setting]] = {}
+        for s in self.candidates(base_dest):
+            cell = (s.pitch, s.amount_l // self.COARSE_STEP, s.amount_r // self.COARSE_STEP)
+            cells.setdefault(cell, []).append(s)
+
+        queue = [(self._lower_bound(cell, base_dest), cell) for cell in cells]
+        heapq.heapify(queue)
+
+        best = []
+        count = 0
+        while queue:
+            bound, cell = heapq.heappop(queue)
+            if bound == math.inf:
+                break
+            if len(best) >= self.max_results and bound >= -best[0][0]:
+                break
+
+            for result in self.evaluate(cells[cell], base_dest):
+                item = (-result.distance, count, result)
+                count += 1
+                if len(best) < self.max_results:
+                    heapq.heappush(best, item)
+                elif result.distance < -best[0][0]:
+                    heapq.heapreplace(best, item)
+
+        best.sort(key=lambda x: (-x[0], x[1]))
+        return [item[2] for item in best]
+
+    def adaptive_search(self, base_dest: Tuple[float, float]) -> Tuple[List[BaseResult], float]:
+        distance = math.hypot(*base_dest)
+        delta = self.get_window() * self.ADAPTIVE_MIN_SCALE
+        max_delta = self.get_window() * self.ADAPTIVE_MAX_SCALE
+
+        seen = set()
+        results = []
+        while True:
+            candidates = []
+            for s in self.candidates(base_dest, delta):
+                key = (s.amount_l, s.amount_r, s.pitch)
+                if key not in seen:
+                    seen.add(key)
+                    candidates.append(s)
+
+            results.extend(self.evaluate(candidates, base_dest))
+            results.sort(key=lambda x: x.distance)
+
+            outside = distance * math.sin(min(delta, math.pi / 2))
+            if len(results) >= self.max_results and results[self.max_results - 1].distance <= outside:
+                break
+            if delta >= max_delta:
+                break
+            delta = min(delta * 2, max_delta)
+
+        return results[: self.max_results], delta
+
+    def pareto_search(self, base_dest: Tuple[float, float]) -> Tuple[List[BaseResult], float]:
+        distance = math.hypot(*base_dest)
+        delta = self.get_window()
+        if distance > 0:
+            delta = max(delta, math.asin(min(1.0, self.pareto_tolerance / distance)))
+        delta = min(delta, math.pi / 2)
+
+        front = ParetoFront()
+        candidates = self.candidates(base_dest, delta)
+        for start in range(0, len(candidates), self.PARETO_CHUNK):
+            for result in self.evaluate(candidates[start:start + self.PARETO_CHUNK], base_dest):
+                if result.distance <= self.pareto_tolerance:
+                    front.add(result, result.distance, result.tick, result.amount_l + result.amount_r)
+
+        results = front.results()
+        results.sort(key=lambda x: x.distance)
+        return results, delta
+
+    def near_search(self, base_dest: Tuple[float, float], radius: float) -> List[BaseResult]:
+        dest_x, dest_z = base_dest
+        dest = math.hypot(dest_x, dest_z)
+        scale = get_scale(self.max_tick)
+        table = self.get_landing_table()
+        limit = self.NEAR_MAX_RESULTS
+        found: Dict[Tuple[int, int, int], BaseResult] = {}
+        # max-heap of (-distance, key), stale entries are skipped when evicting
+        heap: List[Tuple[float, Tuple[int, int, int]]] = []
+
+        def is_current(entry: Tuple[float, Tuple[int, int, int]]) -> bool:
+            result = found.get(entry[1])
+            return result is not None and result.distance == -entry[0]
+
+        def bound() -> float:
+            while len(found) >= limit:
+                if is_current(heap[0]):
+                    return -heap[0][0]
+                heapq.heappop(heap)
+            return radius
+
+        for p in range(2):
+            t = Constant.THRUST[p].x
+            last_tick = max(table.ticks[p])
+
+            for n in range(1, last_tick + 1):
+                s_n = scale[n]
+                if 2 * t * s_n * self.max_tnt < dest - bound():
+                    continue
+
+                center_a = (dest_x + dest_z) / (2 * t * s_n)
+                center_b = (dest_z - dest_x) / (2 * t * s_n)
+
+                r = bound() / (math.sqrt(2) * t * s_n)
+
+                a_min = max(0, math.ceil(center_a - r))
+                a_max = min(self.max_tnt, math.floor(center_a + r))
+                for a in range(a_min, a_max + 1):
+                    limit_distance = bound()
+                    r = limit_distance / (math.sqrt(2) * t * s_n)
+                    h = r * r - (a - center_a) ** 2
+                    if h < 0:
+                        continue
+                    h = math.sqrt(h)
+                    b_min = max(0, math.ceil(center_b - h))
+                    b_max = min(self.max_tnt, math.floor(center_b + h))
+                    for b in range(b_min, b_max + 1):
+                        if n > table.landing_tick(p, a + b):
                             continue
 
-                        flag_success = True
-
-                        pearl0_for_pitch = self._get_pearl(p)
-                        pearl = pearl0_for_pitch.copy()
-                        pearl.accelerate(s.get_thrust())
-
-                        mn = 1e10
-                        best_pos = pearl.get_position()
-                        best_tick = -1
-
-                        for tick in range(self.max_tick):
-                            pearl.tick()
-                            if pearl.get_y() < self.ground_y:
-                                break
-
-                            dis = pearl.get_position().distance(
-                                Vec3d(self.dest_x, pearl.get_y(), self.dest_z)
-                            )
-
-                            if dis < mn:
-                                mn = dis
-                                best_pos = Vec3d(
-                                    pearl.get_position().x,
-                                    pearl.get_position().y,
-                                    pearl.get_position().z,
-                                )
-                                best_tick = tick + 1
-                            else:
-                                break
-
-                        if mn != 1e10:
-                            results.append(
-                                SettingResult(
-                                    distance=mn,
-                                    position=best_pos,
-                                    tick=best_tick,
-                                    light_gray=s.amount_l,
-                                    dark_gray=s.amount_r,
-                                    total_tnt=s.amount_l + s.amount_r,
-                                    bits=s.to_bits(),
-                                    direction=s.direction,
-                                    pitch=s.pitch,
-                                )
-                            )
-                    j += 1
+                        x = (t * a - t * b) * s_n
+                        z = (t * a + t * b) * s_n
+                        distance = math.hypot(x - dest_x, z - dest_z)
+                        if distance > limit_distance:
+                            continue
 
-        if sort_by == SortBy.DISTANCE:
+                        key = (p, a, b)
+                        best = found.get(key)
+                        if best is not None and distance >= best.distance:
+                            continue
+                        if best is None and len(found) >= limit:
+                            if distance >= limit_distance:
+                                continue
+                            while not is_current(heap[0]):
+                                heapq.heappop(heap)
+                            del found[heapq.heappop(heap)[1]]
+
+                        y = table.height(p, a + b, n)
+                        found[key] = BaseResult(distance, Vec3d(x, y, z), n, a, b, p)
+                        heapq.heappush(heap, (-distance, key))
+                        if len(heap) > 2 * limit:
+                            heap = [(-result.distance, k) for k, result in found.items()]
+                            heapq.heapify(heap)
+
+        return sorted(found.values(), key=lambda x: x.distance)
+
+    def search(self, base_dest: Tuple[float, float], complete: bool = False) -> List[BaseResult]:
+        # complete: return every result of the search window rather than the nearest
+        # max_results, for ranking by other keys; only the nearest ones are cached
+        complete = complete and self.search_mode in ("exhaustive", "solver")
+        key = (base_dest, self.ground, self.search_mode)
+        if self.search_mode == "pareto":
+            key += (self.pareto_tolerance,)
+        cached = self.result_cache.get(key) if self.result_cache is not None else None
+        if cached is not None:
+            limit, delta, results = cached
+            if limit is None or (limit >= self.max_results and not complete):
+                if results:
+                    self.window_width = max(self.window_width, delta)
+                return results
+
+        delta = self.get_window()
+        if self.search_mode == "pareto":
+            limit = None
+            results, delta = self.pareto_search(base_dest)
+        elif self.search_mode == "adaptive":
+            limit = self.max_results
+            results, delta = self.adaptive_search(base_dest)
+        elif self.search_mode == "coarse":
+            limit = self.max_results
+            results = self.coarse_search(base_dest)
+        elif self.search_mode == "solver":
+            limit = None
+            results = self.evaluate(self.solve(base_dest), base_dest)
             results.sort(key=lambda x: x.distance)
-        elif sort_by == SortBy.TICK:
-            results.sort(key=lambda x: x.tick)
-        elif sort_by == SortBy.TOTAL_TNT:
-            results.sort(key=lambda x: x.total_tnt)
-        elif sort_by == SortBy.LIGHT_GRAY:
-            results.sort(key=lambda x: x.light_gray)
-        elif sort_by == SortBy.DARK_GRAY:
-            results.sort(key=lambda x: x.dark_gray)
+        else:
+            candidates = self.get_candidates(base_dest)
+            if base_dest in self.admitted and not complete:
+                limit = self.max_results
+                results = self.retarget_search(base_dest, candidates)
+            else:
+                limit = None
+                results = self.evaluate(candidates, base_dest)
+                results.sort(key=lambda x: x.distance)
+
+        found = results
+        if self.search_mode != "pareto" and len(results) > self.max_results:
+            limit = self.max_results
+            results = results[:limit]
+
+        if self.result_cache is not None:
+            self.result_cache.put(key, (limit, delta, results))
+
+        if results:
+            self.window_width = max(self.window_width, delta)
+        return found if complete else results
+
+    def to_world(self, result: BaseResult, direction: int, mirrored: bool) -> SettingResult:
+        amount_l, amount_r = result.amount_l, result.amount_r
+        x = result.position.x
+        if mirrored:
+            amount_l, amount_r = amount_r, amount_l
+            x = -x
+
+        frame = get_frame(self.rotation, direction)
+        x, z = frame.to_world(x, result.position.z)
+        s = Setting(amount_l, amount_r, direction, result.pitch)
+
+        return SettingResult(
+            distance=result.distance,
+            position=Vec3d(self.pearl_x + x, self.player_y + result.position.y, self.pearl_z + z),
+            tick=result.tick,
+            light_gray=amount_l,
+            dark_gray=amount_r,
+            total_tnt=amount_l + amount_r,
+            bits=s.to_bits(),
+            direction=direction,
+            pitch=result.pitch,
+        )
+
+    def generate(self, sort_by: SortBy = SortBy.DISTANCE) -> List[SettingResult]:
+        complete = sort_by != SortBy.DISTANCE
+        searches = []
+        for d in range(4):
+            base_dest, mirrored = self.get_base_destination(d)
+            searches.append(zip(self.search(base_dest, complete), repeat(d), repeat(mirrored)))
+
+        if self.search_mode == "pareto":
+            front = ParetoFront()
+            for search in searches:
+                for item in search:
+                    result = item[0]
+                    front.add(item, result.distance, result.tick, result.amount_l + result.amount_r)
+            results = [self.to_world(*item) for item in front.results()]
+            sort_results(results, sort_by)
+            return results
+
+        if sort_by == SortBy.DISTANCE:
+            merged = heapq.merge(*searches, key=lambda x: x[0].distance)
+            return [self.to_world(*item) for item in islice(merged, self.max_results)]
 
+        results = [self.to_world(*item) for search in searches for item in search]
+        sort_results(results, sort_by)
         return results[: self.max_results]
+
+    def near(self, radius: float) -> List[SettingResult]:
+        searches = []
+        for d in range(4):
+            base_dest, mirrored = self.get_base_destination(d)
+            searches.append([(r, d, mirrored) for r in self.near_search(base_dest, radius)])
+
+        merged = heapq.merge(*searches, key=lambda x: x[0].distance)
+        return [self.to_world(*item) for item in islice(merged, self.NEAR_MAX_RESULTS)]
@@ -0,0 +1,379 @@
+import argparse
+import asyncio
+import importlib.metadata
+import itertools
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mcdreforged.api.all import *
+
+from . import entry
+from .generator import Constant, Setting
+
+COMMANDS = ["gen", "page", "trace"]
+SORT_KEYS = ["distance", "tick", "total_tnt", "light_gray", "dark_gray"]
+ROUTES = [
+    ("gen 100 200", "cmd_generate", (100.0, 200.0)),
+    ("gen -100.5 200.25 pareto", "cmd_generate", (-100.5, 200.25, "pareto")),
+    ("gen 100 200 --all", "cmd_generate_all", (100.0, 200.0)),
+    ("gen @home", "cmd_generate_waypoint", ("home",)),
+    ("waypoint gen home", "cmd_generate_waypoint", ("home",)),
+    ("waypoint add home 100 200", "cmd_add_waypoint", ("home", 100.0, 200.0)),
+    ("waypoint remove home", "cmd_remove_waypoint", ("home",)),
+    ("near 100 200 5", "cmd_near", (100.0, 200.0, 5.0)),
+    ("page 2", "cmd_show_page", (2, "distance")),
+    ("page 2 tick", "cmd_show_page", (2, "tick")),
+    ("trace 0 3", "cmd_trace", ("0", 3)),
+    ("trace top 3", "cmd_trace_top", (3,)),
+    ("trace page 2", "cmd_trace_page", (2,)),
+    ("trace compare 0,1", "cmd_trace_compare", (["0", "1"],)),
+    ("chunks 0", "cmd_chunks", ("0", 1)),
+    ("chunks through 1 -2", "cmd_filter_chunk", (1, -2, True)),
+    ("export csv", "cmd_export", ("csv",)),
+    ("map 32", "cmd_reach_map", (32.0,)),
+]
+
+
+class FakeServer:
+    def __init__(self, data_folder: str):
+        self.data_folder = data_folder
+        self.root = None
+        self.help_messages: List[Tuple[str, Any]] = []
+
+    def get_data_folder(self) -> str:
+        return self.data_folder
+
+    def register_help_message(self, prefix: str, message: Any, *args, **kwargs):
+        self.help_messages.append((prefix, message))
+
+    def register_command(self, root_node: Any):
+        self.root = root_node
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        return lambda *args, **kwargs: None
+
+
+class FakePlayerSource(PlayerCommandSource):
+    def __init__(self, player: str, permission: int = 0):
+        self.player = player
+        self.permission = permission
+        self.replies = 0
+
+    def reply(self, message: Any, **kwargs):
+        self.replies += 1
+
+    def get_permission_level(self) -> int:
+        return self.permission
+
+    def has_permission(self, level: int) -> bool:
+        return self.permission >= level
+
+
+@dataclass
+class Sample:
+    command: str
+    start: float
+    elapsed: float
+    error: Optional[str] = None
+
+
+@dataclass
+class MemorySnapshot:
+    rss: int
+    traced: int
+    players: int
+    results: int
+    batches: int
+    caches: Dict[str, int] = field(default_factory=dict)
+
+
+def get_rss() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def snapshot() -> MemorySnapshot:
+    return MemorySnapshot(
+        rss=get_rss(),
+        traced=tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+        players=len(entry.cached_results),
+        results=sum(len(results) for results in list(entry.cached_results.values())),
+        batches=len(entry.cached_batches),
+        caches={cache.name: len(cache) for cache in entry.planner.caches()},
+    )
+
+
+# the command tree is driven through AbstractNode._entry_execute, the same entry point
+# MCDR's CommandManager uses; it runs callbacks while parsing before 2.14 and returns the
+# scheduled executions from 2.14 on
+MIN_MCDR_VERSION = (2, 0)
+SCHEDULED_MCDR_VERSION = (2, 14)
+
+
+def get_mcdr_version() -> Tuple[int, ...]:
+    text = importlib.metadata.version("mcdreforged")
+    parts = []
+    for part in text.split(".")[:3]:
+        digits = "".join(itertools.takewhile(str.isdigit, part))
+        if not digits:
+            break
+        parts.append(int(digits))
+    return tuple(parts)
+
+
+MCDR_VERSION = get_mcdr_version()
+
+
+class InlineInvoker:
+    def invoke_sync(self, func: Callable[..., Any], args: Any):
+        func(*args)
+
+    def invoke_async(self, func: Callable[..., Any], args: Any):
+        asyncio.run(func(*args))
+
+
+def execute(root: Any, source: CommandSource, command: str):
+    executions = root._entry_execute(source, command)
+    if MCDR_VERSION >= SCHEDULED_MCDR_VERSION:
+        for execution in executions:
+            execution.scheduled_callback.invoke(InlineInvoker())
+
+
+def check_routes(root: Any, source: CommandSource) -> List[str]:
+    failures = []
+    for command, handler, expected in ROUTES:
+        calls = []
+        original = getattr(entry, handler)
+        setattr(entry, handler, lambda src, *args: calls.append(args))
+        try:
+            execute(root, source, f"{entry.PREFIX} {command}")
+        except Exception as e:
+            failures.append(f"{command!r}: {type(e).__name__}: {e}")
+            continue
+        finally:
+            setattr(entry, handler, original)
+        if calls != [expected]:
+            failures.append(f"{command!r}: expected {handler}{expected}, got {calls}")
+    return failures
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return math.nan
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+def random_bits(rng: random.Random) -> str:
+    amount_l, amount_r = rng.randint(0, Constant.MAX_TNT), rng.randint(0, Constant.MAX_TNT)
+    return Setting(amount_l, amount_r, rng.randrange(4), rng.randrange(2)).to_bits()
+
+
+class LoadTest:
+    def __init__(
+        self,
+        root: Any,
+        players: int,
+        commands: int,
+        mix: Dict[str, float],
+        destinations: int = 20,
+        radius: float = 3000.0,
+        think: float = 0.0,
+        seed: int = 0,
+    ):
+        self.root = root
+        self.players = players
+        self.commands = commands
+        self.mix = mix
+        self.think = think
+        self.seed = seed
+        rng = random.Random(seed)
+        self.destinations = [
+            (round(radius * math.cos(a), 1), round(radius * math.sin(a), 1))
+            for a in (rng.uniform(-math.pi, math.pi) for _ in range(destinations))
+        ]
+        self.samples: List[Sample] = []
+        self.lock = threading.Lock()
+
+    def run_command(self, source: FakePlayerSource, rng: random.Random) -> Tuple[str, Callable[[], Any]]:
+        command = rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if command == "gen":
+            dest_x, dest_z = rng.choice(self.destinations)
+            text = f"gen {dest_x} {dest_z}"
+        elif command == "page":
+            text = f"page {rng.randint(1, 10)} {rng.choice(SORT_KEYS)}"
+        else:
+            results = entry.cached_results.get(source.player)
+            bits = rng.choice(results[:10]).bits if results else random_bits(rng)
+            text = f"trace {''.join(c for c in bits if c in '01')} {rng.randint(1, 3)}"
+        return command, lambda: execute(self.root, source, f"{entry.PREFIX} {text}")
+
+    def run_player(self, index: int):
+        rng = random.Random(self.seed * 100003 + index)
+        source = FakePlayerSource(f"player{index}")
+        for _ in range(self.commands):
+            command, func = self.run_command(source, rng)
+            error = None
+            start = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.samples.append(Sample(command, start, elapsed, error))
+            if self.think > 0:
+                time.sleep(rng.expovariate(1 / self.think))
+
+    def run(self, threads: int) -> float:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="PPG-Load") as executor:
+            list(executor.map(self.run_player, range(self.players)))
+        return time.perf_counter() - start
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in COMMANDS:
+            raise argparse.ArgumentTypeError(f"unknown command {name!r}, expected one of {', '.join(COMMANDS)}")
+        try:
+            mix[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {name}: {weight!r}")
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("empty command mix")
+    return mix
+
+
+def format_bytes(value: int) -> str:
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{sign}{value:.0f}{unit}" if unit == "B" else f"{sign}{value:.1f}{unit}"
+        value /= 1024
+    return f"{sign}{value:.1f}GiB"
+
+
+def report(test: LoadTest, elapsed: float, before: MemorySnapshot, after: MemorySnapshot, out=sys.stdout):
+    print(f"{len(test.samples)} commands from {test.players} players in {elapsed:.2f}s", file=out)
+    print(f"throughput {len(test.samples) / max(elapsed, 1e-9):.1f} commands/s", file=out)
+    print(file=out)
+    print(f"{'command':8} {'count':>6} {'errors':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  (ms)", file=out)
+    for command in COMMANDS + ["all"]:
+        samples = [s for s in test.samples if command in ("all", s.command)]
+        if not samples:
+            continue
+        values = sorted(s.elapsed * 1000 for s in samples)
+        errors = sum(1 for s in samples if s.error is not None)
+        print(
+            f"{command:8} {len(samples):>6} {errors:>6} "
+            + " ".join(f"{percentile(values, q):>9.1f}" for q in (0.5, 0.9, 0.99, 1.0)),
+            file=out,
+        )
+
+    print(file=out)
+    def growth(name: str, a: int, b: int, suffix: str = ""):
+        print(f"{name:14} {format_bytes(a):>10} -> {format_bytes(b):>10} ({format_bytes(b - a)}){suffix}", file=out)
+
+    growth("rss", before.rss, after.rss)
+    if after.traced:
+        growth("traced", before.traced, after.traced, f", peak {format_bytes(tracemalloc.get_traced_memory()[1])}")
+    print(
+        f"cached_results {before.players:>4} players / {before.results:>7} results -> "
+        f"{after.players:>4} players / {after.results:>7} results",
+        file=out,
+    )
+    print(f"cached_batches {before.batches:>4} -> {after.batches:>4}", file=out)
+    for name, size in after.caches.items():
+        print(f"cache {name:14} {before.caches.get(name, 0):>4} -> {size:>4} entries", file=out)
+
+    errors = sorted({s.error for s in test.samples if s.error is not None})
+    for error in errors[:10]:
+        print(f"error: {error}", file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pearl_properties_generator.loadtest",
+        description="用模拟的 MCDR 服务器和玩家并发执行 gen/page/trace 命令, 统计延迟、吞吐量和内存增长",
+    )
+    parser.add_argument("-p", "--players", type=int, default=50, help="模拟玩家数")
+    parser.add_argument("-n", "--commands", type=int, default=20, help="每个玩家执行的命令数")
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        default=1,
+        help="同时执行命令的线程数, 默认 1, 与 MCDR 在单个任务线程中执行命令一致; 大于 1 时为并发压力测试",
+    )
+    parser.add_argument(
+        "-m", "--mix", type=parse_mix, default="gen=1,page=3,trace=2", help="命令权重, 默认 gen=1,page=3,trace=2"
+    )
+    parser.add_argument("-d", "--destinations", type=int, default=20, help="玩家随机选择的目标点数量")
+    parser.add_argument("-r", "--radius", type=float, default=3000.0, help="目标点到原点的距离")
+    parser.add_argument("--think", type=float, default=0.0, help="玩家两条命令之间的平均间隔 (秒)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="覆盖配置项, 可重复")
+    parser.add_argument("--data-folder", help="插件数据目录, 默认使用临时目录")
+    parser.add_argument("--check-routes", action="store_true", help="只检查命令树能否把每种命令交给正确的处理函数")
+    parser.add_argument("--tracemalloc", action="store_true", help="用 tracemalloc 统计 Python 内存分配 (会明显变慢)")
+    args = parser.parse_args(argv)
+    if MCDR_VERSION < MIN_MCDR_VERSION:
+        parser.error(
+            f"MCDReforged {'.'.join(map(str, MIN_MCDR_VERSION))}+ is required, "
+            f"found {'.'.join(map(str, MCDR_VERSION))}"
+        )
+
+    data_folder = args.data_folder or tempfile.mkdtemp(prefix="ppg-load-")
+    server = FakeServer(data_folder)
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    entry.on_load(server, None)
+    try:
+        for item in args.set:
+            key, _, value = item.partition("=")
+            if not entry.config.set(key.strip(), value.strip()):
+                parser.error(f"invalid value for {key}: {value!r}")
+
+        failures = check_routes(server.root, FakePlayerSource("route-check", permission=4))
+        for failure in failures:
+            print(f"route: {failure}", file=sys.stderr)
+        if failures or args.check_routes:
+            print(f"{len(ROUTES) - len(failures)}/{len(ROUTES)} routes ok", file=sys.stderr if failures else sys.stdout)
+            return 1 if failures else 0
+
+        test = LoadTest(
+            server.root,
+            args.players, args.commands, args.mix, args.destinations, args.radius, args.think, args.seed
+        )
+        before = snapshot()
+        elapsed = test.run(max(1, args.threads))
+        after = snapshot()
+        report(test, elapsed, before, after)
+    finally:
+        entry.on_unload(server)
+        if args.data_folder is None:
+            shutil.rmtree(data_folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
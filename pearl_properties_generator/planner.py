@@ -0,0 +1,235 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+
+from .cache import DependentCache
+from .config import Config
+from .engines import ENGINES, Calibration, Engine, calibrate, get_engine
+from .generator import (
+    LandingTable,
+    PearlPropertiesGenerator,
+    SettingResult,
+    SortBy,
+    TraceSimulator,
+    get_drifts,
+    sort_results,
+)
+from .reachmap import ReachMap, build_base_map
+from .store import TableStore, get_store
+
+
+@dataclass
+class RequestRecord:
+    time: float
+    kind: str
+    target: str
+    engine: str
+    elapsed: float
+    simulated: int
+
+
+class Planner:
+    HISTORY_SIZE = 20
+
+    def __init__(self, config: Config, shared: Optional["Planner"] = None):
+        self.config = config
+        if shared is not None:
+            self.candidate_cache = shared.candidate_cache
+            self.result_cache = shared.result_cache
+            self.trajectory_cache = shared.trajectory_cache
+            self.landing_cache = shared.landing_cache
+            self.reach_cache = shared.reach_cache
+            self.engine_cache = shared.engine_cache
+            self.history = shared.history
+        else:
+            self.candidate_cache = DependentCache(
+                "candidates", PearlPropertiesGenerator.CANDIDATE_DEPENDS_ON, max_entries=8
+            )
+            self.result_cache = DependentCache(
+                "results", PearlPropertiesGenerator.RESULT_DEPENDS_ON, max_entries=16
+            )
+            self.trajectory_cache = DependentCache(
+                "trajectories", PearlPropertiesGenerator.TRAJECTORY_DEPENDS_ON, max_entries=8
+            )
+            self.landing_cache = DependentCache("landing", LandingTable.DEPENDS_ON, max_entries=8)
+            self.reach_cache = DependentCache("reach_map", ReachMap.DEPENDS_ON, max_entries=4)
+            self.engine_cache = DependentCache("engines", (), max_entries=4)
+            self.history: Deque[RequestRecord] = deque(maxlen=self.HISTORY_SIZE)
+        self.last_activity = time.time()
+        config.add_listener(self.on_config_changed)
+
+    def caches(self) -> List[DependentCache]:
+        return [
+            self.candidate_cache,
+            self.result_cache,
+            self.trajectory_cache,
+            self.landing_cache,
+            self.reach_cache,
+            self.engine_cache,
+        ]
+
+    def on_config_changed(self, key: str):
+        for cache in self.caches():
+            cache.on_config_changed(key)
+
+    def close(self):
+        self.config.remove_listener(self.on_config_changed)
+
+    def calibrate(self) -> Calibration:
+        key = (self.config.get("max_tnt"), self.config.get("max_tick"))
+        calibration = self.engine_cache.get(key)
+        if calibration is None:
+            calibration = calibrate(*key, self.get_ground(), self.config.get("rotation"))
+            self.engine_cache.put(key, calibration)
+        return calibration
+
+    def get_engine(self) -> Engine:
+        name = self.config.get("engine")
+        if name in ENGINES and ENGINES[name].available():
+            return get_engine(name)
+        return get_engine(self.calibrate().engine)
+
+    def peek_calibration(self) -> Optional[Calibration]:
+        return self.engine_cache.peek((self.config.get("max_tnt"), self.config.get("max_tick")))
+
+    def peek_engine(self) -> Optional[Engine]:
+        name = self.config.get("engine")
+        if name in ENGINES and ENGINES[name].available():
+            return get_engine(name)
+        calibration = self.peek_calibration()
+        return get_engine(calibration.engine) if calibration is not None else None
+
+    def touch(self):
+        self.last_activity = time.time()
+
+    def record(self, kind: str, target: str, engine: Optional[Engine], elapsed: float, simulated: int = 0):
+        name = engine.NAME if engine is not None else "-"
+        self.history.append(RequestRecord(time.time(), kind, target, name, elapsed, simulated))
+
+    def get_store(self) -> Optional[TableStore]:
+        folder = self.config.get("shared_folder")
+        return get_store(folder) if folder not in ("", "off") else None
+
+    def get_ground(self, ground_y: Optional[float] = None) -> float:
+        if ground_y is None:
+            ground_y = self.config.get("ground_y")
+        return ground_y - self.config.get("player_y")
+
+    def get_landing_table(self, ground_y: Optional[float] = None) -> LandingTable:
+        key = (self.get_ground(ground_y), self.config.get("max_tick"), self.config.get("max_tnt"))
+        table = self.landing_cache.get(key)
+        if table is None:
+            store = self.get_store()
+            table = store.landing_table(*key) if store is not None else LandingTable(*key)
+            self.landing_cache.put(key, table)
+        return table
+
+    def create_generator(
+        self,
+        dest_x: float,
+        dest_z: float,
+        search_mode: Optional[str] = None,
+        ground_y: Optional[float] = None,
+    ) -> PearlPropertiesGenerator:
+        if search_mode is None:
+            search_mode = self.config.get("search_mode")
+        if ground_y is None:
+            ground_y = self.config.get("ground_y")
+        return PearlPropertiesGenerator(
+            pearl_x=self.config.get("pearl_x"),
+            pearl_z=self.config.get("pearl_z"),
+            player_y=self.config.get("player_y"),
+            rotation=self.config.get("rotation"),
+            max_tnt=self.config.get("max_tnt"),
+            ground_y=ground_y,
+            max_tick=self.config.get("max_tick"),
+            dest_x=dest_x,
+            dest_z=dest_z,
+            max_results=self.config.get("max_results"),
+            candidate_cache=self.candidate_cache,
+            result_cache=self.result_cache,
+            search_mode=search_mode,
+            pareto_tolerance=self.config.get("pareto_tolerance"),
+            landing_table=self.get_landing_table(ground_y),
+            trajectory_cache=self.trajectory_cache,
+            engine=self.get_engine(),
+        )
+
+    def create_simulator(self, ground_y: Optional[float] = None) -> TraceSimulator:
+        if ground_y is None:
+            ground_y = self.config.get("ground_y")
+        return TraceSimulator(
+            pearl_x=self.config.get("pearl_x"),
+            pearl_z=self.config.get("pearl_z"),
+            player_y=self.config.get("player_y"),
+            rotation=self.config.get("rotation"),
+            ground_y=ground_y,
+            max_tick=self.config.get("max_tick"),
+            landing_table=self.get_landing_table(ground_y),
+            engine=self.get_engine(),
+        )
+
+    def filter_by_chunk(
+        self, results: List[SettingResult], chunk: Tuple[int, int], through: bool = True
+    ) -> List[SettingResult]:
+        simulator = self.create_simulator()
+        return [
+            r for r in results
+            if any(v.chunk == chunk for v in simulator.chunk_visits(r.bits)) == through
+        ]
+
+    def analyze_sensitivity(
+        self,
+        results: List[SettingResult],
+        perturbation: Optional[int] = None,
+        ground_y: Optional[float] = None,
+    ):
+        if perturbation is None:
+            perturbation = self.config.get("sensitivity")
+        if perturbation <= 0:
+            return
+        for r, drift in zip(results, get_drifts(results, perturbation, self.get_landing_table(ground_y))):
+            r.drift = drift
+
+    def generate(
+        self,
+        dest_x: float,
+        dest_z: float,
+        sort_by: SortBy = SortBy.DISTANCE,
+        search_mode: Optional[str] = None,
+        ground_y: Optional[float] = None,
+        generator: Optional[PearlPropertiesGenerator] = None,
+    ) -> List[SettingResult]:
+        start = time.perf_counter()
+        if generator is None:
+            generator = self.create_generator(dest_x, dest_z, search_mode, ground_y)
+        results = generator.generate(sort_by=SortBy.DISTANCE if sort_by == SortBy.DRIFT else sort_by)
+        self.analyze_sensitivity(results, ground_y=ground_y)
+        if sort_by == SortBy.DRIFT:
+            sort_results(results, sort_by)
+
+        self.record(
+            "gen", f"{dest_x:g} {dest_z:g}", generator.engine, time.perf_counter() - start, generator.simulated
+        )
+        return results
+
+    def near(self, dest_x: float, dest_z: float, radius: float) -> List[SettingResult]:
+        results = self.create_generator(dest_x, dest_z).near(radius)
+        self.analyze_sensitivity(results)
+        return results
+
+    def reach_map(self, cell_size: float = 16.0) -> ReachMap:
+        key = (cell_size, self.get_ground())
+        base_map = self.reach_cache.get(key)
+        if base_map is None:
+            table, max_tnt = self.get_landing_table(), self.config.get("max_tnt")
+            store = self.get_store()
+            if store is not None:
+                base_map = store.base_map(table, max_tnt, cell_size)
+            else:
+                base_map = build_base_map(table, max_tnt, cell_size)
+            self.reach_cache.put(key, base_map)
+        return base_map.to_world(
+            self.config.get("rotation"), self.config.get("pearl_x"), self.config.get("pearl_z")
+        )
@@ -0,0 +1,83 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cli import create_planner
+from .config import Config
+from .generator import SettingResult, SortBy, sort_results
+from .planner import Planner
+
+MAX_WORKERS = 4
+MAX_WORKER_PLANNERS = 8
+
+# per-process planners keyed by the profile's full config, so every profile
+# searched in a process has its own generator caches
+_planners: "OrderedDict[Tuple[Tuple[str, Any], ...], Planner]" = OrderedDict()
+
+
+def _generate_profile(task: Tuple[str, Dict[str, Any], float, float]) -> List[SettingResult]:
+    name, values, dest_x, dest_z = task
+    key = tuple(sorted(values.items()))
+    planner = _planners.pop(key, None)
+    if planner is None:
+        planner = create_planner(values)
+    _planners[key] = planner
+    while len(_planners) > MAX_WORKER_PLANNERS:
+        _planners.popitem(last=False)[1].close()
+
+    results = planner.generate(dest_x, dest_z)
+    for r in results:
+        r.cannon = name
+    return results
+
+
+class CannonProfiles:
+    def __init__(self, config: Config, shared: Optional[Planner] = None):
+        self.config = config
+        self.shared = shared
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def names(self) -> List[str]:
+        return sorted(self.config.get_profiles())
+
+    def get_values(self, name: str) -> Dict[str, Any]:
+        values = {key: self.config.get(key) for key in Config.CONFIG_KEYS}
+        values.update(self.config.get_profiles()[name])
+        if values["engine"] == "auto" and self.shared is not None:
+            # reuse the calibration instead of repeating it in every worker
+            values["engine"] = self.shared.get_engine().NAME
+        return values
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(min(MAX_WORKERS, os.cpu_count() or 1))
+        return self.executor
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def generate_all(
+        self, dest_x: float, dest_z: float, sort_by: SortBy = SortBy.DISTANCE
+    ) -> List[SettingResult]:
+        names = self.names()
+        if not names:
+            return []
+
+        tasks = [(name, self.get_values(name), dest_x, dest_z) for name in names]
+        try:
+            batches = list(self.get_executor().map(_generate_profile, tasks))
+        except (OSError, BrokenProcessPool):
+            # no usable worker processes on this host, search in this process instead
+            self.close()
+            batches = [_generate_profile(task) for task in tasks]
+
+        results = [r for batch in batches for r in batch]
+        results.sort(key=lambda r: (r.distance, r.tick))
+        results = results[: self.config.get("max_results")]
+        if sort_by != SortBy.DISTANCE:
+            sort_results(results, sort_by)
+        return results
@@ -0,0 +1,54 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, List, Tuple
+
+
+@dataclass
+class ProfileReport:
+    result: Any
+    elapsed: float
+    stats_path: str
+    summary_path: str
+    top: List[Tuple[str, int, float, float]]
+
+
+def get_function_name(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def profile_call(folder: str, name: str, func: Callable[..., Any], *args: Any, top: int = 25) -> ProfileReport:
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    result = profiler.runcall(func, *args)
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}")
+    stats_path = base + ".prof"
+    summary_path = base + ".txt"
+    profiler.dump_stats(stats_path)
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stream.write(f"{name}: {elapsed:.3f}s\n\n")
+    stats.sort_stats("cumulative").print_stats(top)
+    stats.sort_stats("tottime").print_stats(top)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(stream.getvalue())
+
+    hot = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    return ProfileReport(
+        result=result,
+        elapsed=elapsed,
+        stats_path=stats_path,
+        summary_path=summary_path,
+        top=[(get_function_name(func), nc, tt, ct) for func, (_, nc, tt, ct, _) in hot[:top]],
+    )
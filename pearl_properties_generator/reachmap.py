@@ -0,0 +1,303 @@
+import math
+import os
+import struct
+import zlib
+from array import array
+from typing import Any, Optional, Tuple
+
+from .generator import Constant, LandingTable, get_frame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ReachMap:
+    DEPENDS_ON = LandingTable.DEPENDS_ON
+    MAX_CELLS = 1024
+    UNREACHABLE = 2 ** 31 - 1
+    MAGIC = b"PPGM"
+    LAYOUT = struct.Struct("<dQQ")
+
+    def __init__(
+        self,
+        cell_size: float,
+        half_cells: int,
+        origin_x: float = 0.0,
+        origin_z: float = 0.0,
+        best_distance: Optional[Any] = None,
+        min_tnt: Optional[Any] = None,
+    ):
+        self.cell_size = cell_size
+        self.half_cells = half_cells
+        self.size = 2 * half_cells
+        self.origin_x = origin_x
+        self.origin_z = origin_z
+        if best_distance is None:
+            best_distance = array("f", [math.inf]) * (self.size * self.size)
+        if min_tnt is None:
+            min_tnt = array("i", [self.UNREACHABLE]) * (self.size * self.size)
+        self.best_distance = best_distance
+        self.min_tnt = min_tnt
+        self.points = 0
+
+    def to_bytes(self) -> bytes:
+        return b"".join((
+            self.LAYOUT.pack(self.cell_size, self.half_cells, self.points),
+            memoryview(self.best_distance).tobytes(),
+            memoryview(self.min_tnt).tobytes(),
+        ))
+
+    @classmethod
+    def from_buffer(cls, buffer: Any) -> "ReachMap":
+        view = memoryview(buffer).cast("B")
+        cell_size, half_cells, points = cls.LAYOUT.unpack_from(view)
+        cells = 4 * half_cells * half_cells
+        start = cls.LAYOUT.size
+        reach_map = cls(
+            cell_size,
+            half_cells,
+            best_distance=view[start:start + 4 * cells].cast("f"),
+            min_tnt=view[start + 4 * cells:start + 8 * cells].cast("i"),
+        )
+        reach_map.points = points
+        return reach_map
+
+    @property
+    def min_x(self) -> float:
+        return self.origin_x - self.half_cells * self.cell_size
+
+    @property
+    def min_z(self) -> float:
+        return self.origin_z - self.half_cells * self.cell_size
+
+    def get_cell(self, x: float, z: float) -> Optional[int]:
+        i = math.floor((x - self.origin_x) / self.cell_size) + self.half_cells
+        j = math.floor((z - self.origin_z) / self.cell_size) + self.half_cells
+        if 0 <= i < self.size and 0 <= j < self.size:
+            return j * self.size + i
+        return None
+
+    def get_center(self, cell: int) -> Tuple[float, float]:
+        i, j = cell % self.size, cell // self.size
+        return (
+            self.origin_x + (i - self.half_cells + 0.5) * self.cell_size,
+            self.origin_z + (j - self.half_cells + 0.5) * self.cell_size,
+        )
+
+    def add(self, x: float, z: float, total_tnt: int):
+        cell = self.get_cell(x, z)
+        if cell is None:
+            return
+        center_x, center_z = self.get_center(cell)
+        distance = math.hypot(x - center_x, z - center_z)
+        if distance < self.best_distance[cell]:
+            self.best_distance[cell] = distance
+        if total_tnt < self.min_tnt[cell]:
+            self.min_tnt[cell] = total_tnt
+        self.points += 1
+
+    def reachable_cells(self) -> int:
+        return sum(1 for tnt in self.min_tnt if tnt != self.UNREACHABLE)
+
+    def query(self, x: float, z: float) -> Optional[Tuple[float, int]]:
+        cell = self.get_cell(x, z)
+        if cell is None or self.min_tnt[cell] == self.UNREACHABLE:
+            return None
+        return self.best_distance[cell], self.min_tnt[cell]
+
+    def to_world(self, rotation: int, pearl_x: float, pearl_z: float) -> "ReachMap":
+        world = ReachMap(self.cell_size, self.half_cells, pearl_x, pearl_z)
+        world.points = self.points * 4
+        size = self.size
+
+        if np is not None:
+            best_distance = np.frombuffer(self.best_distance, dtype=np.float32)
+            min_tnt = np.frombuffer(self.min_tnt, dtype=np.int32)
+            cells = np.flatnonzero(min_tnt != self.UNREACHABLE)
+            u = 2 * (cells % size) - size + 1
+            v = 2 * (cells // size) - size + 1
+            world_distance = np.frombuffer(world.best_distance, dtype=np.float32)
+            world_tnt = np.frombuffer(world.min_tnt, dtype=np.int32)
+            for direction in range(4):
+                x, z = get_frame(rotation, direction).to_world(u, v)
+                target = ((z + size - 1) // 2) * size + (x + size - 1) // 2
+                np.minimum.at(world_distance, target, best_distance[cells])
+                np.minimum.at(world_tnt, target, min_tnt[cells])
+            return world
+
+        for direction in range(4):
+            frame = get_frame(rotation, direction)
+            for cell in range(size * size):
+                tnt = self.min_tnt[cell]
+                if tnt == self.UNREACHABLE:
+                    continue
+                i, j = cell % size, cell // size
+                x, z = frame.to_world(2 * i - size + 1, 2 * j - size + 1)
+                target = ((z + size - 1) // 2) * size + (x + size - 1) // 2
+                if self.best_distance[cell] < world.best_distance[target]:
+                    world.best_distance[target] = self.best_distance[cell]
+                if tnt < world.min_tnt[target]:
+                    world.min_tnt[target] = tnt
+
+        return world
+
+    def save(self, path: str) -> str:
+        if np is not None:
+            path = os.path.splitext(path)[0] + ".npz"
+            min_tnt = np.frombuffer(self.min_tnt, dtype=np.int32).reshape(self.size, self.size)
+            np.savez_compressed(
+                path,
+                best_distance=np.frombuffer(self.best_distance, dtype=np.float32).reshape(self.size, self.size),
+                min_tnt=np.where(min_tnt == self.UNREACHABLE, -1, min_tnt),
+                min_x=self.min_x,
+                min_z=self.min_z,
+                cell_size=self.cell_size,
+            )
+            return path
+
+        path = os.path.splitext(path)[0] + ".bin"
+        with open(path, "wb") as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack("<Iddd", self.size, self.min_x, self.min_z, self.cell_size))
+            f.write(zlib.compress(self.best_distance.tobytes() + self.min_tnt.tobytes()))
+        return path
+
+    def _get_pixels(self) -> bytes:
+        size = self.size
+        half_diagonal = self.cell_size * math.sqrt(0.5)
+
+        if np is not None:
+            level = np.minimum(1.0, np.frombuffer(self.best_distance, dtype=np.float32) / half_diagonal)
+            pixels = np.empty((size * size, 3), dtype=np.uint8)
+            pixels[:, 0] = 255 * np.minimum(1.0, 2 * level)
+            pixels[:, 1] = 255 * np.clip(2 - 2 * level, 0.0, 1.0)
+            pixels[:, 2] = 48
+            pixels[np.frombuffer(self.min_tnt, dtype=np.int32) == self.UNREACHABLE] = 0
+            rows = np.zeros((size, size * 3 + 1), dtype=np.uint8)
+            rows[:, 1:] = pixels.reshape(size, size * 3)
+            return rows.tobytes()
+
+        rows = bytearray()
+        for j in range(size):
+            rows.append(0)
+            for i in range(size):
+                cell = j * size + i
+                if self.min_tnt[cell] == self.UNREACHABLE:
+                    rows += b"\x00\x00\x00"
+                    continue
+                level = min(1.0, self.best_distance[cell] / half_diagonal)
+                rows += bytes((int(255 * min(1.0, 2 * level)), int(255 * min(1.0, 2 - 2 * level)), 48))
+        return bytes(rows)
+
+    def save_png(self, path: str):
+        size = self.size
+
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            body = tag + data
+            return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)))
+            f.write(chunk(b"IDAT", zlib.compress(self._get_pixels(), 6)))
+            f.write(chunk(b"IEND", b""))
+
+
+def _get_reach(table: LandingTable, max_tnt: int) -> float:
+    reach = 0.0
+    for pitch in range(2):
+        t = Constant.THRUST[pitch].x
+        for total_tnt in range(2 * max_tnt + 1):
+            tick = table.landing_tick(pitch, total_tnt)
+            if tick == 0:
+                continue
+            amount_l = min(total_tnt, max_tnt)
+            amount_r = total_tnt - amount_l
+            reach = max(reach, t * math.hypot(amount_l - amount_r, total_tnt) * table.scale[tick])
+    return reach
+
+
+def _sweep(reach_map: ReachMap, table: LandingTable, max_tnt: int):
+    for pitch in range(2):
+        t = Constant.THRUST[pitch].x
+        for total_tnt in range(2 * max_tnt + 1):
+            tick = table.landing_tick(pitch, total_tnt)
+            if tick == 0:
+                continue
+            scale = table.scale[tick]
+            for amount_l in range(max(0, total_tnt - max_tnt), min(total_tnt, max_tnt) + 1):
+                amount_r = total_tnt - amount_l
+                x = (t * amount_l - t * amount_r) * scale
+                z = (t * amount_l + t * amount_r) * scale
+                reach_map.add(x, z, total_tnt)
+
+
+def _sweep_numpy(reach_map: ReachMap, table: LandingTable, max_tnt: int):
+    size = reach_map.size
+    half = reach_map.half_cells
+    cell_size = reach_map.cell_size
+    best_distance = np.frombuffer(reach_map.best_distance, dtype=np.float32)
+    min_tnt = np.frombuffer(reach_map.min_tnt, dtype=np.int32)
+
+    for pitch in range(2):
+        t = Constant.THRUST[pitch].x
+        for total_tnt in range(2 * max_tnt + 1):
+            tick = table.landing_tick(pitch, total_tnt)
+            if tick == 0:
+                continue
+            scale = table.scale[tick]
+            amount_l = np.arange(max(0, total_tnt - max_tnt), min(total_tnt, max_tnt) + 1, dtype=np.float64)
+            amount_r = total_tnt - amount_l
+            x = (t * amount_l - t * amount_r) * scale
+            z = (t * amount_l + t * amount_r) * scale
+            i = np.floor(x / cell_size).astype(np.int64) + half
+            j = np.floor(z / cell_size).astype(np.int64) + half
+            inside = (i >= 0) & (i < size) & (j >= 0) & (j < size)
+            i, j, x, z = i[inside], j[inside], x[inside], z[inside]
+            distance = np.hypot(x - (i - half + 0.5) * cell_size, z - (j - half + 0.5) * cell_size)
+            cells = j * size + i
+            np.minimum.at(best_distance, cells, distance.astype(np.float32))
+            np.minimum.at(min_tnt, cells, np.int32(total_tnt))
+            reach_map.points += len(cells)
+
+
+def build_base_map(table: LandingTable, max_tnt: int, cell_size: float = 16.0) -> ReachMap:
+    reach = _get_reach(table, max_tnt)
+    cell_size = max(cell_size, 2 * reach / ReachMap.MAX_CELLS)
+    half_cells = max(1, math.ceil(reach / cell_size))
+    reach_map = ReachMap(cell_size, half_cells)
+
+    if np is not None:
+        _sweep_numpy(reach_map, table, max_tnt)
+    else:
+        _sweep(reach_map, table, max_tnt)
+    return reach_map
+
+
+def build_reach_map(
+    pearl_x: float,
+    pearl_z: float,
+    player_y: float,
+    rotation: int,
+    max_tnt: int,
+    ground_y: float,
+    max_tick: int,
+    cell_size: float = 16.0,
+    table: Optional[LandingTable] = None,
+    base_map: Optional[ReachMap] = None,
+) -> ReachMap:
+    if base_map is None:
+        if table is None:
+            table = LandingTable(ground_y - player_y, max_tick, max_tnt)
+        base_map = build_base_map(table, max_tnt, cell_size)
+    return base_map.to_world(rotation, pearl_x, pearl_z)
+
+
+def export_reach_map(reach_map: ReachMap, folder: str, name: str = "reach_map") -> Tuple[str, str]:
+    os.makedirs(folder, exist_ok=True)
+    data_path = reach_map.save(os.path.join(folder, name))
+    png_path = os.path.join(folder, name + ".png")
+    reach_map.save_png(png_path)
+    return data_path, png_path
@@ -0,0 +1,439 @@
+import argparse
+import http.client
+import json
+import math
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+from .export import to_record
+from .generator import SortBy, TracePoint
+from .planner import Planner
+
+HOST = "127.0.0.1"
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def parse_bits(bits: Any) -> str:
+    if not isinstance(bits, str):
+        raise ServiceError(400, "bits must be a string")
+    bits_clean = "".join(c for c in bits if c in "01")
+    if len(bits_clean) != 27:
+        raise ServiceError(400, f"invalid bits: expected 27 bits, got {len(bits_clean)}")
+    return bits_clean
+
+
+def parse_number(request: Dict[str, Any], key: str, required: bool = False) -> Any:
+    value = request.get(key)
+    if value is None and required:
+        raise ServiceError(400, f"missing field: {key}")
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ServiceError(400, f"{key} must be a number")
+    if value is not None and not math.isfinite(value):
+        raise ServiceError(400, f"{key} must be finite")
+    return value
+
+
+def parse_limit(request: Dict[str, Any]) -> Optional[int]:
+    value = request.get("limit")
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+        raise ServiceError(400, "limit must be a non-negative integer")
+    return value
+
+
+def point_record(point: TracePoint) -> Dict[str, Any]:
+    return {
+        "tick": point.tick,
+        "chunk": point.chunk,
+        "x": point.position.x,
+        "y": point.position.y,
+        "z": point.position.z,
+        "mx": point.momentum.x,
+        "my": point.momentum.y,
+        "mz": point.momentum.z,
+    }
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "PearlPropertiesGenerator"
+    timeout = 60
+
+    def log_message(self, format: str, *args):
+        pass
+
+    def send_json(self, status: int, payload: Any):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= self.server.service.MAX_BODY:
+            self.close_connection = True
+            raise ServiceError(413, "request body too large")
+        return self.rfile.read(length)
+
+    def dispatch(self, method: str):
+        service: QueryService = self.server.service
+        try:
+            body = self.read_body()
+            route = service.ROUTES.get((method, self.path.split("?", 1)[0]))
+            if route is None:
+                raise ServiceError(404, f"unknown endpoint: {method} {self.path}")
+            try:
+                request = json.loads(body or b"{}")
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise ServiceError(400, f"invalid json: {e}")
+            if not isinstance(request, dict):
+                raise ServiceError(400, "request must be a json object")
+            self.send_json(200, getattr(service, route)(request))
+        except ServiceError as e:
+            self.send_json(e.status, {"error": e.message})
+        except Exception as e:
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], service: "QueryService"):
+        self.service = service
+        super().__init__(address, QueryHandler)
+
+
+class QueryService:
+    ROUTES = {
+        ("GET", "/stats"): "handle_stats",
+        ("POST", "/generate"): "handle_generate",
+        ("POST", "/trace"): "handle_trace",
+        ("POST", "/batch"): "handle_batch",
+    }
+    BATCH_WINDOW = 0.005
+    MAX_BATCH = 64
+    MAX_REQUESTS = 256
+    MAX_BODY = 1 << 20
+    TRACE_TIMEOUT = 60.0
+
+    def __init__(self, planner: Planner, host: str = HOST):
+        self.planner = planner
+        self.config = planner.config
+        self.host = host
+        self.server: Optional[QueryServer] = None
+        self.error: Optional[str] = None
+        self.queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self.pending: Dict[Tuple[Any, ...], Future] = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_traces = 0
+        self.config.add_listener(self.on_config_changed)
+
+    @property
+    def port(self) -> Optional[int]:
+        return self.server.server_address[1] if self.server is not None else None
+
+    def start(self, port: int):
+        self.stop()
+        self.server = QueryServer((self.host, port), self)
+        self.error = None
+        threading.Thread(target=self.server.serve_forever, name="PPG-Service", daemon=True).start()
+        threading.Thread(target=self.run_batches, args=(self.queue,), name="PPG-Service-Batch", daemon=True).start()
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        with self.lock:
+            self.server = None
+            tasks, self.queue = self.queue, queue.Queue()
+        tasks.put(None)
+        self.cancel_pending(tasks)
+
+    @staticmethod
+    def cancel_pending(tasks: "queue.Queue[Optional[Tuple[str, Future]]]"):
+        while True:
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                return
+            if task is None:
+                continue
+            try:
+                task[1].set_exception(ServiceError(503, "service stopped"))
+            except InvalidStateError:
+                pass
+
+    def apply_config(self):
+        port = self.config.get("service_port")
+        if self.server is not None and self.port == port:
+            return
+        self.stop()
+        if port > 0:
+            try:
+                self.start(port)
+            except OSError as e:
+                self.error = str(e)
+
+    def on_config_changed(self, key: str):
+        if key == "service_port":
+            self.apply_config()
+
+    def close(self):
+        self.config.remove_listener(self.on_config_changed)
+        self.stop()
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def run_batches(self, tasks: "queue.Queue[Optional[Tuple[str, Future]]]"):
+        while True:
+            task = tasks.get()
+            if task is None:
+                self.cancel_pending(tasks)
+                return
+            batch = [task]
+            deadline = time.monotonic() + self.BATCH_WINDOW
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    task = tasks.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if task is None:
+                    tasks.put(None)
+                    break
+                batch.append(task)
+            self.run_batch(batch)
+
+    def run_batch(self, batch: List[Tuple[str, Future]]):
+        bits_list = list(dict.fromkeys(bits for bits, _ in batch))
+        try:
+            start = time.perf_counter()
+            simulator = self.planner.create_simulator()
+            traces = simulator.simulate_batch(bits_list)
+            self.planner.record(
+                "http trace", f"{len(bits_list)} 条", simulator.engine, time.perf_counter() - start, len(bits_list)
+            )
+        except Exception as e:
+            for _, future in batch:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            return
+
+        self.count("batches")
+        self.count("batched_traces", len(batch))
+        index = {bits: i for i, bits in enumerate(bits_list)}
+        for bits, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            i = index[bits]
+            future.set_result({
+                "bits": bits,
+                "landing_tick": traces.landing_tick(i),
+                "points": [point_record(p) for p in traces.trace(i)],
+            })
+
+    def submit_trace(self, request: Dict[str, Any]) -> Future:
+        bits = parse_bits(request.get("bits"))
+        future: Future = Future()
+        with self.lock:
+            if self.server is None:
+                raise ServiceError(503, "service stopped")
+            self.queue.put((bits, future))
+        return future
+
+    def wait_trace(self, future: Future) -> Dict[str, Any]:
+        try:
+            return future.result(timeout=self.TRACE_TIMEOUT)
+        except TimeoutError:
+            future.cancel()
+            raise ServiceError(504, "trace timed out")
+
+    def generate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        dest_x, dest_z = parse_number(request, "x", True), parse_number(request, "z", True)
+        ground_y = parse_number(request, "ground_y")
+        limit = parse_limit(request)
+        try:
+            sort_by = SortBy(request.get("sort_by", SortBy.DISTANCE.value))
+        except ValueError:
+            raise ServiceError(400, f"unknown sort_by: {request.get('sort_by')!r}")
+        search_mode = request.get("search_mode")
+        if search_mode is not None and search_mode not in Config.SEARCH_MODES:
+            raise ServiceError(400, f"unknown search_mode: {search_mode!r}")
+
+        key = (dest_x, dest_z, sort_by, search_mode, ground_y)
+        with self.lock:
+            future = self.pending.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.pending[key] = future
+            else:
+                self.coalesced += 1
+
+        if owner:
+            try:
+                future.set_result(self.planner.generate(dest_x, dest_z, sort_by, search_mode, ground_y))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    del self.pending[key]
+
+        results = future.result()
+        if limit is not None:
+            results = results[:limit]
+        return {
+            "dest": [dest_x, dest_z],
+            "count": len(results),
+            "results": [to_record((dest_x, dest_z), r) for r in results],
+        }
+
+    def handle_stats(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        engine = self.planner.peek_engine()
+        return {
+            "engine": engine.NAME if engine is not None else None,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "batched_traces": self.batched_traces,
+            "caches": {
+                cache.name: {"size": len(cache), "hits": cache.hits, "misses": cache.misses}
+                for cache in self.planner.caches()
+            },
+        }
+
+    def handle_generate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.count("requests")
+        return self.generate(request)
+
+    def handle_trace(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.count("requests")
+        return self.wait_trace(self.submit_trace(request))
+
+    def handle_batch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        requests = request.get("requests")
+        if not isinstance(requests, list):
+            raise ServiceError(400, "requests must be a list")
+        if len(requests) > self.MAX_REQUESTS:
+            raise ServiceError(413, f"at most {self.MAX_REQUESTS} requests per batch")
+        self.count("requests", len(requests))
+
+        responses: List[Any] = [None] * len(requests)
+        traces: List[Tuple[int, Future]] = []
+        for i, item in enumerate(requests):
+            try:
+                if not isinstance(item, dict) or item.get("type") not in ("generate", "trace"):
+                    raise ServiceError(400, "type must be 'generate' or 'trace'")
+                if item["type"] == "trace":
+                    traces.append((i, self.submit_trace(item)))
+            except ServiceError as e:
+                responses[i] = {"error": e.message}
+
+        for i, item in enumerate(requests):
+            if responses[i] is None and item["type"] == "generate":
+                try:
+                    responses[i] = self.generate(item)
+                except ServiceError as e:
+                    responses[i] = {"error": e.message}
+                except Exception as e:
+                    responses[i] = {"error": f"{type(e).__name__}: {e}"}
+        for i, future in traces:
+            try:
+                responses[i] = self.wait_trace(future)
+            except ServiceError as e:
+                responses[i] = {"error": e.message}
+            except Exception as e:
+                responses[i] = {"error": f"{type(e).__name__}: {e}"}
+        return {"responses": responses}
+
+
+class ServiceClient:
+    def __init__(self, port: int, host: str = HOST, timeout: float = 120.0):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Any:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        self.connection.request(method, path, data, headers)
+        response = self.connection.getresponse()
+        payload = json.loads(response.read())
+        if response.status != 200:
+            raise ServiceError(response.status, payload.get("error", ""))
+        return payload
+
+    def generate(self, x: float, z: float, **options: Any) -> Dict[str, Any]:
+        return self.request("POST", "/generate", dict(options, x=x, z=z))
+
+    def trace(self, bits: str) -> Dict[str, Any]:
+        return self.request("POST", "/trace", {"bits": bits})
+
+    def batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.request("POST", "/batch", {"requests": requests})["responses"]
+
+    def stats(self) -> Dict[str, Any]:
+        return self.request("GET", "/stats")
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pearl_properties_generator.service",
+        description="在本机启动 JSON 查询服务 (不依赖 MCDR), 用于调试 HTTP 客户端",
+    )
+    parser.add_argument("-p", "--port", type=int, default=0, help="监听端口, 0 为自动选择")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="覆盖配置项, 可重复")
+    args = parser.parse_args(argv)
+
+    config = Config()
+    for item in args.set:
+        key, _, value = item.partition("=")
+        if not config.set(key.strip(), value.strip()):
+            parser.error(f"invalid value for {key}: {value!r}")
+
+    planner = Planner(config)
+    service = QueryService(planner)
+    service.start(args.port)
+    print(f"listening on http://{HOST}:{service.port}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        planner.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .generator import LandingTable
+from .reachmap import ReachMap, build_base_map
+
+
+class TableStore:
+    VERSION = 1
+    MAGIC = b"PPGS"
+    HEADER = struct.Struct("<4sI32sQ")
+    WAIT_TIMEOUT = 30.0
+    POLL_INTERVAL = 0.05
+    STALE_AFTER = 300.0
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.hits = 0
+        self.waits = 0
+        self.builds = 0
+        self.fallbacks = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get_key(cls, kind: str, values: Dict[str, Any]) -> bytes:
+        text = json.dumps(
+            {"kind": kind, "version": cls.VERSION, "byteorder": sys.byteorder, "values": values},
+            sort_keys=True,
+        )
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_path(self, kind: str, key: bytes) -> str:
+        return os.path.join(self.folder, f"{kind}-{key.hex()[:32]}.bin")
+
+    def count(self, name: str):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def open(self, path: str, key: bytes) -> Optional[memoryview]:
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(data) >= self.HEADER.size:
+            magic, version, digest, size = self.HEADER.unpack_from(data)
+            if (magic, version, digest) == (self.MAGIC, self.VERSION, key) and self.HEADER.size + size == len(data):
+                return memoryview(data)[self.HEADER.size:]
+        data.close()
+        return None
+
+    def acquire(self, path: str) -> Optional[int]:
+        os.makedirs(self.folder, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > self.STALE_AFTER:
+                    os.remove(path)
+            except OSError:
+                pass
+            return None
+        os.write(fd, str(os.getpid()).encode())
+        return fd
+
+    def write(self, path: str, key: bytes, payload: bytes):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, key, len(payload)))
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def load(self, kind: str, values: Dict[str, Any], build: Callable[[], bytes]) -> memoryview:
+        key = self.get_key(kind, values)
+        path = self.get_path(kind, key)
+        lock_path = path + ".lock"
+        deadline = time.monotonic() + self.WAIT_TIMEOUT
+        waited = False
+
+        while True:
+            view = self.open(path, key)
+            if view is not None:
+                self.count("waits" if waited else "hits")
+                return view
+
+            try:
+                fd = self.acquire(lock_path)
+            except OSError:
+                self.count("fallbacks")
+                return memoryview(build())
+
+            if fd is not None:
+                payload = None
+                try:
+                    view = self.open(path, key)
+                    if view is not None:
+                        self.count("hits")
+                        return view
+                    payload = build()
+                    self.write(path, key, payload)
+                    self.count("builds")
+                except OSError:
+                    self.count("fallbacks")
+                    return memoryview(payload if payload is not None else build())
+                finally:
+                    os.close(fd)
+                    try:
+                        os.remove(lock_path)
+                    except OSError:
+                        pass
+                return self.open(path, key) or memoryview(payload)
+
+            if time.monotonic() >= deadline:
+                self.count("fallbacks")
+                return memoryview(build())
+            waited = True
+            time.sleep(self.POLL_INTERVAL)
+
+    def landing_table(self, ground: float, max_tick: int, max_tnt: int) -> LandingTable:
+        values = {"ground": ground, "max_tick": max_tick, "max_tnt": max_tnt}
+        view = self.load("landing", values, lambda: LandingTable(ground, max_tick, max_tnt).to_bytes())
+        return LandingTable.from_buffer(ground, max_tick, max_tnt, view)
+
+    def base_map(self, table: LandingTable, max_tnt: int, cell_size: float) -> ReachMap:
+        values = {"ground": table.ground, "max_tick": table.max_tick, "max_tnt": max_tnt, "cell_size": cell_size}
+        view = self.load("reach_map", values, lambda: build_base_map(table, max_tnt, cell_size).to_bytes())
+        return ReachMap.from_buffer(view)
+
+
+_stores: Dict[str, TableStore] = {}
+
+
+def get_store(folder: str) -> TableStore:
+    folder = os.path.abspath(os.path.expanduser(folder))
+    store = _stores.get(folder)
+    if store is None:
+        store = TableStore(folder)
+        _stores[folder] = store
+    return store
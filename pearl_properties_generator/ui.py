@@ -1,10 +1,14 @@
+import time
 from typing import List, Optional, TYPE_CHECKING
 
 from mcdreforged.api.all import *
 
 if TYPE_CHECKING:
     from .config import Config
-    from .generator import SettingResult, TracePoint
+    from .generator import ChunkVisit, SettingResult, TraceBatch, TracePoint
+    from .planner import Planner
+    from .service import QueryService
+    from .waypoints import Waypoints
 
 PREFIX = "!!ppg"
 
@@ -126,7 +130,7 @@ class SettingsUI:
 
         rotation_val = self.config.get("rotation")
         rotation_text = RTextList(
-            RText(f"  Rotation: ", color=RTextUI.KEY_COLOR),
+            RText("  Rotation: ", color=RTextUI.KEY_COLOR),
             RText(f"{self.config.get_rotation_name()} ({rotation_val})", color=RTextUI.VALUE_COLOR),
             RText(" "),
         )
@@ -155,6 +159,57 @@ class SettingsUI:
             RTextUI.key_value("Max Results", self.config.get("max_results"), "max_results")
         )
 
+        search_mode = self.config.get("search_mode")
+        search_mode_text = RTextList(
+            RText("  Search Mode: ", color=RTextUI.KEY_COLOR),
+            RText(search_mode, color=RTextUI.VALUE_COLOR),
+            RText(" (近似, 可能遗漏部分结果) " if search_mode == "solver" else " ", color=RColor.gray),
+        )
+        for mode in self.config.SEARCH_MODES:
+            if mode == search_mode:
+                search_mode_text.append(RText(f"[{mode}]", color=RColor.green))
+            else:
+                search_mode_text.append(
+                    RTextUI.button(
+                        mode,
+                        f"{PREFIX} set search_mode {mode}",
+                        f"设置为 {mode}" + (" (近似, 可能遗漏部分结果)" if mode == "solver" else ""),
+                    )
+                )
+            search_mode_text.append(RText(" "))
+        lines.append(search_mode_text)
+        lines.append(
+            RTextUI.key_value("Pareto Tolerance (tol)", f"{self.config.get('pareto_tolerance'):.2f}", "tol")
+        )
+        lines.append(
+            RTextUI.key_value("Sensitivity ±TNT (sens)", str(self.config.get("sensitivity")), "sens")
+        )
+
+        engine = self.config.get("engine")
+        engine_text = RTextList(
+            RText("  Engine: ", color=RTextUI.KEY_COLOR),
+            RText(engine, color=RTextUI.VALUE_COLOR),
+            RText(" "),
+        )
+        for name in self.config.engine_names():
+            if name == engine:
+                engine_text.append(RText(f"[{name}]", color=RColor.green))
+            else:
+                engine_text.append(
+                    RTextUI.button(name, f"{PREFIX} set engine {name}", f"设置为 {name}")
+                )
+            engine_text.append(RText(" "))
+        lines.append(engine_text)
+        lines.append(RTextUI.key_value("Max Near Radius", f"{self.config.get('max_radius'):g}", "max_radius"))
+        shared_folder = self.config.get("shared_folder")
+        lines.append(
+            RTextUI.key_value("Shared Folder", shared_folder if shared_folder not in ("", "off") else "未启用", "shared_folder")
+        )
+        service_port = self.config.get("service_port")
+        lines.append(
+            RTextUI.key_value("Service Port", service_port if service_port > 0 else "未启用", "service_port")
+        )
+
         lines.append(RText(""))
         lines.append(RTextUI.divider())
 
@@ -162,6 +217,8 @@ class SettingsUI:
             RTextUI.button("重置默认", f"{PREFIX} reset", "重置所有配置为默认值", color=RColor.red),
             RText("  "),
             RTextUI.suggest_button("生成配置", f"{PREFIX} gen ", "输入目标坐标生成配置", color=RColor.green),
+            RText("  "),
+            RTextUI.button("炮台", f"{PREFIX} cannon", "管理炮台配置", color=RColor.gold),
         )
         lines.append(action_line)
 
@@ -200,6 +257,10 @@ class ResultsUI:
             ("light_gray", "浅灰"),
             ("dark_gray", "深灰"),
         ]
+        show_drift = any(r.drift is not None for r in self.results)
+        show_cannon = any(r.cannon is not None for r in self.results)
+        if show_drift:
+            sort_options.append(("drift", "漂移"))
         for key, name in sort_options:
             if key == self.sort_by:
                 sort_line.append(RText(f"[{name}]", color=RColor.green))
@@ -229,6 +290,8 @@ class ResultsUI:
                 RText("│", color=RColor.dark_gray),
                 RText(" 总TNT ", color=RTextUI.HEADER_COLOR),
                 RText("│", color=RColor.dark_gray),
+                RText(" 漂移   │" if show_drift else "", color=RTextUI.HEADER_COLOR),
+                RText(" 炮台       │" if show_cannon else "", color=RTextUI.HEADER_COLOR),
                 RText(" 操作", color=RTextUI.HEADER_COLOR),
             )
         )
@@ -253,6 +316,13 @@ class ResultsUI:
                 RText(f" {r.total_tnt:>5} ", color=RColor.green),
                 RText("│", color=RColor.dark_gray),
             )
+            if show_drift:
+                drift = "-" if r.drift is None else f"{r.drift:.2f}"
+                row.append(RText(f" {drift:>6} ", color=RColor.red))
+                row.append(RText("│", color=RColor.dark_gray))
+            if show_cannon:
+                row.append(RText(f" {r.cannon or '-':<10} ", color=RColor.gold))
+                row.append(RText("│", color=RColor.dark_gray))
 
             row.append(
                 RTextUI.copy_button("复制", r.bits, "点击复制比特序列")
@@ -273,6 +343,18 @@ class ResultsUI:
             row.append(
                 RTextUI.button("轨迹", f"{PREFIX} trace {bits_clean}", "生成珍珠轨迹", color=RColor.light_purple)
             )
+            row.append(RText(" "))
+            row.append(
+                RTextUI.button("区块", f"{PREFIX} chunks {bits_clean}", "查看经过的区块", color=RColor.green)
+            )
+            if r.cannon is not None:
+                row.append(RText(" "))
+                row.append(
+                    RTextUI.button(
+                        "切换", f"{PREFIX} cannon use {r.cannon}",
+                        f"切换到炮台 {r.cannon}, 之后轨迹和区块按该炮台计算", color=RColor.gold,
+                    )
+                )
 
             lines.append(row)
 
@@ -416,6 +498,370 @@ class TraceUI:
         return RTextList(*[RTextList(line, "\n") for line in lines])
 
 
+class TraceCompareUI:
+    PAGE_SIZE = 10
+
+    def __init__(self, batch: "TraceBatch", page: int = 1):
+        self.batch = batch
+        self.page = page
+        self.total_pages = max(1, (batch.max_length + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+
+    def build(self) -> RTextBase:
+        lines = [
+            RTextUI.header("珍珠轨迹对比"),
+            RText(""),
+        ]
+
+        for i, bits in enumerate(self.batch.bits_list):
+            lines.append(
+                RTextList(
+                    RText(f"#{i + 1} ", color=RColor.gold),
+                    RText(bits, color=RColor.aqua),
+                    RText(" "),
+                    RTextUI.copy_button("复制", bits, "点击复制比特序列"),
+                    RText(" 落地 Tick: ", color=RColor.gray),
+                    RText(str(self.batch.landing_tick(i)), color=RColor.yellow),
+                )
+            )
+        lines.append(RText(""))
+
+        header = RTextList(RText(" Tick ", color=RTextUI.HEADER_COLOR))
+        for i in range(len(self.batch)):
+            header.append(RText("│", color=RColor.dark_gray))
+            label = "区块 / 位置" if i == 0 else "区块 / Δ位置"
+            header.append(RText(f" #{i + 1} {label} ", color=RTextUI.HEADER_COLOR))
+        lines.append(header)
+        lines.append(RTextUI.divider())
+
+        start_idx = (self.page - 1) * self.PAGE_SIZE
+        end_idx = min(start_idx + self.PAGE_SIZE, self.batch.max_length)
+
+        for tick in range(start_idx, end_idx):
+            base = self.batch.point(0, tick)
+            row = RTextList(RText(f" {tick:>4} ", color=RColor.yellow))
+
+            for i in range(len(self.batch)):
+                row.append(RText("│", color=RColor.dark_gray))
+                t = self.batch.point(i, tick)
+                if t is None:
+                    row.append(RText(" 已落地 ", color=RTextUI.DISABLED_COLOR))
+                    continue
+
+                pos_str = f"({t.position.x:.4f}, {t.position.y:.4f}, {t.position.z:.4f})"
+                chunk_color = RColor.green if base is None or base.chunk == t.chunk else RColor.red
+                if i == 0 or base is None:
+                    value = RText(f" {pos_str} ", color=RColor.aqua)
+                else:
+                    delta = t.position - base.position
+                    value = RText(f" Δ({delta.x:+.2f}, {delta.y:+.2f}, {delta.z:+.2f}) ", color=RColor.aqua)
+                value.h(f"§e位置: §f{pos_str}")
+                value.c(RAction.copy_to_clipboard, f"{t.position.x} {t.position.y} {t.position.z}")
+                row.append(RText(f" {t.chunk}", color=chunk_color))
+                row.append(value)
+
+            lines.append(row)
+
+        lines.append(RText(""))
+        lines.append(RTextUI.divider())
+
+        page_line = RTextList(
+            RText(f"第 {self.page}/{self.total_pages} 页 (共 {self.batch.max_length} tick)  ", color=RColor.gray)
+        )
+
+        if self.page > 1:
+            page_line.append(
+                RTextUI.button("◀ 上一页", f"{PREFIX} trace page {self.page - 1}", "上一页")
+            )
+        else:
+            page_line.append(RText("[◀ 上一页]", color=RTextUI.DISABLED_COLOR))
+
+        page_line.append(RText("  "))
+
+        if self.page < self.total_pages:
+            page_line.append(
+                RTextUI.button("下一页 ▶", f"{PREFIX} trace page {self.page + 1}", "下一页")
+            )
+        else:
+            page_line.append(RText("[下一页 ▶]", color=RTextUI.DISABLED_COLOR))
+
+        page_line.append(RText("  "))
+        page_line.append(
+            RTextUI.button("返回设置", f"{PREFIX} set", "返回配置界面", color=RColor.gray)
+        )
+
+        lines.append(page_line)
+
+        return RTextList(*[RTextList(line, "\n") for line in lines])
+
+
+class ChunkUI:
+    PAGE_SIZE = 10
+
+    def __init__(self, visits: List["ChunkVisit"], bits: str, page: int = 1):
+        self.visits = visits
+        self.bits = bits
+        self.page = page
+        self.total_pages = max(1, (len(visits) + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+
+    def build(self) -> RTextBase:
+        lines = [
+            RTextUI.header("经过的区块"),
+            RText(""),
+            RTextList(
+                RText("比特序列: ", color=RColor.gray),
+                RText(self.bits, color=RColor.aqua),
+                RText(" "),
+                RTextUI.copy_button("复制", self.bits, "点击复制比特序列"),
+            ),
+            RText(""),
+            RTextList(
+                RText("  # ", color=RTextUI.HEADER_COLOR),
+                RText("│", color=RColor.dark_gray),
+                RText(" 区块        ", color=RTextUI.HEADER_COLOR),
+                RText("│", color=RColor.dark_gray),
+                RText(" 进入 ", color=RTextUI.HEADER_COLOR),
+                RText("│", color=RColor.dark_gray),
+                RText(" 离开 ", color=RTextUI.HEADER_COLOR),
+                RText("│", color=RColor.dark_gray),
+                RText(" Tick 数", color=RTextUI.HEADER_COLOR),
+            ),
+            RTextUI.divider(),
+        ]
+
+        start_idx = (self.page - 1) * self.PAGE_SIZE
+        end_idx = min(start_idx + self.PAGE_SIZE, len(self.visits))
+
+        for i in range(start_idx, end_idx):
+            v = self.visits[i]
+            chunk = RText(f" {str(v):<11} ", color=RColor.green)
+            chunk.h(f"§e区块坐标: §f{v.chunk[0] * 16} ~ {v.chunk[0] * 16 + 15}, {v.chunk[1] * 16} ~ {v.chunk[1] * 16 + 15}")
+            chunk.c(RAction.copy_to_clipboard, f"{v.chunk[0]} {v.chunk[1]}")
+            lines.append(
+                RTextList(
+                    RText(f"{i + 1:>3} ", color=RColor.white),
+                    RText("│", color=RColor.dark_gray),
+                    chunk,
+                    RText("│", color=RColor.dark_gray),
+                    RText(f" {v.enter_tick:>4} ", color=RColor.yellow),
+                    RText("│", color=RColor.dark_gray),
+                    RText(f" {v.exit_tick:>4} ", color=RColor.yellow),
+                    RText("│", color=RColor.dark_gray),
+                    RText(f" {v.exit_tick - v.enter_tick + 1}", color=RColor.aqua),
+                )
+            )
+
+        lines.append(RText(""))
+        lines.append(RTextUI.divider())
+
+        page_line = RTextList(
+            RText(f"第 {self.page}/{self.total_pages} 页 (共 {len(self.visits)} 个区块)  ", color=RColor.gray)
+        )
+
+        if self.page > 1:
+            page_line.append(
+                RTextUI.button("◀ 上一页", f"{PREFIX} chunks {self.bits} {self.page - 1}", "上一页")
+            )
+        else:
+            page_line.append(RText("[◀ 上一页]", color=RTextUI.DISABLED_COLOR))
+
+        page_line.append(RText("  "))
+
+        if self.page < self.total_pages:
+            page_line.append(
+                RTextUI.button("下一页 ▶", f"{PREFIX} chunks {self.bits} {self.page + 1}", "下一页")
+            )
+        else:
+            page_line.append(RText("[下一页 ▶]", color=RTextUI.DISABLED_COLOR))
+
+        page_line.append(RText("  "))
+        page_line.append(
+            RTextUI.button("轨迹", f"{PREFIX} trace {self.bits}", "查看逐 tick 轨迹", color=RColor.light_purple)
+        )
+
+        lines.append(page_line)
+
+        return RTextList(*[RTextList(line, "\n") for line in lines])
+
+
+class CannonUI:
+    def __init__(self, config: "Config"):
+        self.config = config
+
+    def build(self) -> RTextBase:
+        lines = [
+            RTextUI.header("炮台配置"),
+            RText(""),
+        ]
+
+        profiles = self.config.get_profiles()
+        if not profiles:
+            lines.append(RText("  尚未保存任何炮台", color=RColor.gray))
+
+        for name in sorted(profiles):
+            profile = profiles[name]
+            rotation = self.config.ROTATION_NAMES[profile["rotation"]]
+            current = all(self.config.get(key) == value for key, value in profile.items())
+            lines.append(
+                RTextList(
+                    RText(f"  {name} ", color=RColor.green if current else RTextUI.KEY_COLOR),
+                    RText(
+                        f"({profile['pearl_x']}, {profile['player_y']}, {profile['pearl_z']}) {rotation} ",
+                        color=RColor.gray,
+                    ),
+                    RTextUI.button("使用", f"{PREFIX} cannon use {name}", f"切换到炮台 {name}"),
+                    RText(" "),
+                    RTextUI.suggest_button("删除", f"{PREFIX} cannon remove {name}", f"删除炮台 {name}", color=RColor.red),
+                )
+            )
+
+        lines.append(RText(""))
+        lines.append(RTextUI.divider())
+        lines.append(
+            RTextList(
+                RTextUI.suggest_button("保存当前炮台", f"{PREFIX} cannon save ", "以当前 px/pz/py/rotation 保存炮台"),
+                RText("  "),
+                RTextUI.button("返回设置", f"{PREFIX} set", "返回配置界面", color=RColor.gray),
+            )
+        )
+
+        return RTextList(*[RTextList(line, "\n") for line in lines])
+
+
+class WaypointUI:
+    def __init__(self, waypoints: "Waypoints"):
+        self.waypoints = waypoints
+
+    def build(self) -> RTextBase:
+        lines = [
+            RTextUI.header("路径点"),
+            RText(""),
+        ]
+
+        names = self.waypoints.names()
+        if not names:
+            lines.append(RText("  尚未保存任何路径点", color=RColor.gray))
+
+        hits = misses = 0
+        for name in names:
+            waypoint = self.waypoints.get(name)
+            if waypoint is None:
+                continue
+            hits += waypoint.hits
+            misses += waypoint.misses
+            warm = self.waypoints.is_warm(waypoint)
+            rate = waypoint.hit_rate
+            lines.append(
+                RTextList(
+                    RText(f"  {name} ", color=RTextUI.KEY_COLOR),
+                    RText(f"({waypoint.x:g}, {waypoint.z:g}) ", color=RColor.gray),
+                    RText("已预计算 " if warm else "未预计算 ", color=RColor.green if warm else RColor.gray),
+                    RText(
+                        f"命中 {waypoint.hits}/{waypoint.hits + waypoint.misses}"
+                        + (f" ({rate:.0%}) " if rate is not None else " "),
+                        color=RTextUI.VALUE_COLOR,
+                    ),
+                    RTextUI.button("生成", f"{PREFIX} gen @{name}", f"生成到路径点 {name} 的配置"),
+                    RText(" "),
+                    RTextUI.suggest_button("删除", f"{PREFIX} waypoint remove {name}", f"删除路径点 {name}", color=RColor.red),
+                )
+            )
+
+        if hits + misses:
+            lines.append(RText(""))
+            lines.append(RTextUI.key_value("总命中率", f"{hits}/{hits + misses} ({hits / (hits + misses):.0%})"))
+
+        lines.append(RText(""))
+        lines.append(RTextUI.divider())
+        lines.append(
+            RTextList(
+                RTextUI.suggest_button("添加路径点", f"{PREFIX} waypoint add ", "添加路径点: <name> <x> <z>"),
+                RText("  "),
+                RTextUI.button("立即预计算", f"{PREFIX} waypoint refresh", "为所有未预计算的路径点生成配置"),
+            )
+        )
+
+        return RTextList(*[RTextList(line, "\n") for line in lines])
+
+
+class StatsUI:
+    def __init__(self, planner: "Planner", service: Optional["QueryService"] = None):
+        self.planner = planner
+        self.service = service
+
+    def build(self) -> RTextBase:
+        lines = [
+            RTextUI.header("运行统计"),
+            RText(""),
+        ]
+
+        config = self.planner.config
+        lines.append(RText("§e【模拟引擎】", color=RColor.yellow))
+        lines.append(RTextUI.key_value("配置", config.get("engine"), "engine"))
+        engine = self.planner.peek_engine()
+        lines.append(RTextUI.key_value("当前", engine.NAME if engine is not None else "未校准 (下次请求时校准)"))
+        calibration = self.planner.peek_calibration()
+        if calibration is not None:
+            timings = ", ".join(
+                f"{name} {elapsed * 1000:.1f}ms"
+                for name, elapsed in sorted(calibration.timings.items(), key=lambda x: x[1])
+            )
+            lines.append(RTextUI.key_value("校准", f"{calibration.engine} ({calibration.samples} 个配置: {timings})"))
+
+        lines.append(RText(""))
+        lines.append(RText("§e【缓存】", color=RColor.yellow))
+        for cache in self.planner.caches():
+            lines.append(
+                RTextUI.key_value(
+                    cache.name,
+                    f"{len(cache)} 项, 命中 {cache.hits}, 未命中 {cache.misses}, 失效 {cache.invalidations}",
+                )
+            )
+
+        store = self.planner.get_store()
+        if store is not None:
+            lines.append(RText(""))
+            lines.append(RText("§e【共享表】", color=RColor.yellow))
+            lines.append(RTextUI.key_value("目录", store.folder))
+            lines.append(
+                RTextUI.key_value(
+                    "加载",
+                    f"命中 {store.hits}, 等待其他实例 {store.waits}, 构建 {store.builds}, 本地回退 {store.fallbacks}",
+                )
+            )
+
+        service = self.service
+        if service is not None and (service.server is not None or service.error is not None):
+            lines.append(RText(""))
+            lines.append(RText("§e【查询服务】", color=RColor.yellow))
+            if service.server is not None:
+                lines.append(RTextUI.key_value("地址", f"http://{service.host}:{service.port}"))
+            else:
+                lines.append(RTextUI.key_value("错误", service.error))
+            lines.append(
+                RTextUI.key_value(
+                    "请求",
+                    f"{service.requests} 个, 合并相同生成 {service.coalesced} 次, "
+                    f"轨迹 {service.batched_traces} 条分 {service.batches} 批模拟",
+                )
+            )
+
+        lines.append(RText(""))
+        lines.append(RText("§e【最近请求】", color=RColor.yellow))
+        if not self.planner.history:
+            lines.append(RText("  暂无请求", color=RColor.gray))
+        for record in reversed(self.planner.history):
+            lines.append(
+                RTextList(
+                    RText(f"  {time.strftime('%H:%M:%S', time.localtime(record.time))} ", color=RColor.gray),
+                    RText(f"{record.kind} {record.target} ", color=RTextUI.KEY_COLOR),
+                    RText(record.engine, color=RTextUI.VALUE_COLOR),
+                    RText(f" {record.elapsed * 1000:.0f}ms, 模拟 {record.simulated} 次", color=RColor.gray),
+                )
+            )
+
+        return RTextList(*[RTextList(line, "\n") for line in lines])
+
+
 def show_help(source: CommandSource):
     lines = [
         RTextUI.header("Pearl Properties Generator 帮助"),
@@ -436,16 +882,72 @@ def show_help(source: CommandSource):
             RText(f"  {PREFIX} gen <dest_x> <dest_z> ", color=RColor.gold),
             RText("- 生成珍珠炮配置", color=RColor.gray),
         ),
+        RTextList(
+            RText(f"  {PREFIX} gen <dest_x> <dest_z> pareto ", color=RColor.gold),
+            RText("- 生成距离/Tick/TNT 的帕累托最优配置", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} gen <dest_x> <dest_z> --all ", color=RColor.gold),
+            RText("- 同时搜索所有已保存的炮台并统一排名", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} cannon [save|use|remove <name>] ", color=RColor.gold),
+            RText("- 管理炮台配置", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} waypoint [add <name> <x> <z>|remove <name>|refresh] ", color=RColor.gold),
+            RText("- 管理路径点, 空闲时自动预计算", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} gen @<name> | waypoint gen <name> ", color=RColor.gold),
+            RText("- 生成到路径点的配置", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} near <x> <z> <radius> ", color=RColor.gold),
+            RText("- 列出轨迹经过该点半径内的全部配置", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} export <csv|json|jsonl|bin> ", color=RColor.gold),
+            RText("- 导出上次的结果到数据目录", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} map [cell_size] ", color=RColor.gold),
+            RText("- 导出可达性地图 (数据 + PNG 热力图)", color=RColor.gray),
+        ),
         RTextList(
             RText(f"  {PREFIX} trace <bits> ", color=RColor.gold),
             RText("- 模拟珍珠轨迹", color=RColor.gray),
         ),
+        RTextList(
+            RText(f"  {PREFIX} trace compare <bits> <bits> ... ", color=RColor.gold),
+            RText("- 批量模拟并逐 tick 对比多条轨迹", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} trace top <n> ", color=RColor.gold),
+            RText("- 对比上次生成结果中的前 n 个配置", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} chunks <bits> ", color=RColor.gold),
+            RText("- 列出轨迹经过的区块及进出 tick", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} chunks through|avoid <cx> <cz> ", color=RColor.gold),
+            RText("- 按是否经过某区块筛选上次的结果", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} profile gen <x> <z> | trace <bits> ", color=RColor.gold),
+            RText("- 在性能分析器下执行命令并保存结果 (管理员)", color=RColor.gray),
+        ),
+        RTextList(
+            RText(f"  {PREFIX} stats ", color=RColor.gold),
+            RText("- 显示模拟引擎、缓存命中率和最近请求", color=RColor.gray),
+        ),
         RTextList(
             RText(f"  {PREFIX} reset ", color=RColor.gold),
             RText("- 重置为默认配置", color=RColor.gray),
         ),
         RText(""),
-        RText("§7可用配置项: px, pz, py, rotation, max_tnt, gy, max_tick, max_results"),
+        RText("§7可用配置项: px, pz, py, rotation, max_tnt, gy, max_tick, max_results, search_mode, tol, sens, engine, max_radius, shared_folder, service_port"),
     ]
     source.reply(RTextList(*[RTextList(line, "\n") for line in lines]))
 
@@ -0,0 +1,467 @@
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import Config
+from .engines import ENGINES, available_engines, get_engine
+from .generator import (
+    BaseResult,
+    Constant,
+    Pearl,
+    PearlPropertiesGenerator,
+    Setting,
+    TraceSimulator,
+    Vec3d,
+)
+from .planner import Planner
+
+REFERENCE_TOLERANCE = 1e-6
+SETTINGS_PER_CASE = 64
+BATCH_SIZE = 32
+SEARCH_MAX_TNT = 400
+SEARCH_MAX_RESULTS = 20
+MAX_SHRINK_STEPS = 2000
+REFERENCE_SEARCH_MODES = ("exhaustive", "coarse", "adaptive")
+
+
+@dataclass
+class Case:
+    pearl_x: float
+    pearl_z: float
+    player_y: float
+    rotation: int
+    max_tnt: int
+    ground_y: float
+    max_tick: int
+    dest_x: float
+    dest_z: float
+    search_mode: str = "exhaustive"
+    settings: List[Tuple[int, int, int, int]] = field(default_factory=list)
+
+    def get_settings(self) -> List[Setting]:
+        return [Setting(*s) for s in self.settings]
+
+    def create_generator(self) -> PearlPropertiesGenerator:
+        return PearlPropertiesGenerator(
+            pearl_x=self.pearl_x,
+            pearl_z=self.pearl_z,
+            player_y=self.player_y,
+            rotation=self.rotation,
+            max_tnt=self.max_tnt,
+            ground_y=self.ground_y,
+            max_tick=self.max_tick,
+            dest_x=self.dest_x,
+            dest_z=self.dest_z,
+        )
+
+    def create_simulator(self) -> TraceSimulator:
+        return TraceSimulator(
+            pearl_x=self.pearl_x,
+            pearl_z=self.pearl_z,
+            player_y=self.player_y,
+            rotation=self.rotation,
+            ground_y=self.ground_y,
+            max_tick=self.max_tick,
+        )
+
+    def create_planner(self, engine: str) -> Planner:
+        config = Config()
+        for key in Config.PROFILE_KEYS + ["max_tnt", "ground_y", "max_tick", "search_mode"]:
+            config.set(key, getattr(self, key))
+        config.set("max_results", SEARCH_MAX_RESULTS)
+        config.set("engine", engine)
+        return Planner(config)
+
+
+@dataclass
+class Mismatch:
+    check: str
+    engine: Optional[str]
+    message: str
+    case: Case
+
+    @property
+    def name(self) -> str:
+        return self.check if self.engine is None else f"{self.check}:{self.engine}"
+
+
+def random_bits(rng: random.Random) -> str:
+    return "".join(rng.choice("01") for _ in range(27))
+
+
+def random_case(rng: random.Random, search: bool = False) -> Case:
+    player_y = rng.uniform(-60, 320)
+    pearl_x = rng.uniform(-10000, 10000)
+    pearl_z = rng.uniform(-10000, 10000)
+    angle = rng.uniform(-math.pi, math.pi)
+    radius = rng.uniform(0, 5000)
+
+    settings = []
+    for _ in range(SETTINGS_PER_CASE):
+        s = Setting.from_bits(random_bits(rng))
+        settings.append((s.amount_l, s.amount_r, s.direction, int(s.pitch)))
+
+    return Case(
+        pearl_x=pearl_x,
+        pearl_z=pearl_z,
+        player_y=player_y,
+        rotation=rng.randrange(4),
+        max_tnt=rng.randint(1, SEARCH_MAX_TNT if search else Constant.MAX_TNT),
+        ground_y=player_y - rng.uniform(-60, 300),
+        max_tick=rng.choice([rng.randint(0, 60), rng.randint(1, 2000), 1000]),
+        dest_x=pearl_x + radius * math.cos(angle),
+        dest_z=pearl_z + radius * math.sin(angle),
+        search_mode=rng.choice(Config.SEARCH_MODES),
+        settings=settings,
+    )
+
+
+def get_base_setting(generator: PearlPropertiesGenerator, s: Setting) -> Tuple[Setting, Tuple[float, float], bool]:
+    base_dest, mirrored = generator.get_base_destination(s.direction)
+    if mirrored:
+        return Setting(s.amount_r, s.amount_l, 0, s.pitch), base_dest, True
+    return Setting(s.amount_l, s.amount_r, 0, s.pitch), base_dest, False
+
+
+def simulate_reference(case: Case, s: Setting) -> Optional[Tuple[int, float, Vec3d]]:
+    pos = Vec3d(case.pearl_x, case.player_y, case.pearl_z) + Constant.DELTA_POSITION[s.pitch]
+    pearl = Pearl(pos, Vec3d(Constant.MOTION[s.pitch].x, Constant.MOTION[s.pitch].y, Constant.MOTION[s.pitch].z))
+    pearl.accelerate(s.get_thrust(case.rotation))
+
+    best = None
+    mn = 1e10
+    for tick in range(case.max_tick):
+        pearl.tick()
+        if pearl.get_y() < case.ground_y:
+            break
+        dis = pearl.get_position().distance(Vec3d(case.dest_x, pearl.get_y(), case.dest_z))
+        if dis < mn:
+            mn = dis
+            best = (tick + 1, dis, Vec3d(pearl.position.x, pearl.position.y, pearl.position.z))
+        else:
+            break
+    return best
+
+
+def compare_results(a: Optional[BaseResult], b: Optional[BaseResult], tolerance: float) -> Optional[str]:
+    if (a is None) != (b is None):
+        return f"{a} != {b}"
+    if a is None:
+        return None
+    if abs(a.distance - b.distance) > tolerance:
+        return f"distance {a.distance!r} != {b.distance!r} (tick {a.tick} / {b.tick})"
+    if a.tick == b.tick:
+        for axis in "xyz":
+            if abs(getattr(a.position, axis) - getattr(b.position, axis)) > tolerance:
+                return f"position {a.position!r} != {b.position!r} at tick {a.tick}"
+    return None
+
+
+def check_bits(case: Case, engine: Optional[str] = None) -> Optional[str]:
+    for s in case.get_settings():
+        if max(s.amount_l, s.amount_r) > Constant.MAX_TNT:
+            continue
+        bits = s.to_bits()
+        expected = (s.amount_l, s.amount_r, s.direction, s.pitch)
+        t = Setting.from_bits(bits)
+        actual = (t.amount_l, t.amount_r, t.direction, t.pitch)
+        if actual != expected:
+            return f"{expected} -> {bits} -> {actual}"
+        if Setting.from_bits(bits).to_bits() != bits:
+            return f"{bits} is not canonical"
+    return None
+
+
+def check_engine(case: Case, engine: str) -> Optional[str]:
+    generator = case.create_generator()
+    tolerance = getattr(ENGINES[engine], "TOLERANCE", 0.0)
+    batches: Dict[Tuple[float, float], List[Setting]] = {}
+    for s in case.get_settings():
+        base, base_dest, _ = get_base_setting(generator, s)
+        batches.setdefault(base_dest, []).append(base)
+
+    for base_dest, settings in batches.items():
+        padded = (settings * BATCH_SIZE)[:max(len(settings), BATCH_SIZE)]
+        expected = [generator.simulate(s, base_dest) for s in settings]
+        actual = get_engine(engine).simulate(generator, padded, base_dest)
+        for s, a, b in zip(settings, expected, actual):
+            if ENGINES[engine].EXACT:
+                for name, x, y in zip(("result", "complete", "segment"), a, b):
+                    if x != y:
+                        return f"{(s.amount_l, s.amount_r, s.pitch)} at {base_dest}: {name} {y} != {x}"
+                continue
+            message = compare_results(a[0], b[0], tolerance)
+            if message is not None:
+                return f"{(s.amount_l, s.amount_r, s.pitch)} at {base_dest}: {message}"
+    return None
+
+
+def check_reference(case: Case, engine: Optional[str] = None) -> Optional[str]:
+    generator = case.create_generator()
+    for s in case.get_settings():
+        base, base_dest, mirrored = get_base_setting(generator, s)
+        result = generator.simulate(base, base_dest)[0]
+        actual = None if result is None else generator.to_world(result, s.direction, mirrored)
+        expected = simulate_reference(case, s)
+
+        if (actual is None) != (expected is None):
+            return f"{s.to_bits()}: {actual} != {expected}"
+        if actual is None:
+            continue
+        tick, distance, position = expected
+        if actual.bits != s.to_bits():
+            return f"{s.to_bits()}: bits {actual.bits}"
+        if abs(actual.distance - distance) > REFERENCE_TOLERANCE:
+            return f"{s.to_bits()}: distance {actual.distance!r} != {distance!r} (tick {actual.tick} / {tick})"
+        if actual.tick == tick and any(
+            abs(getattr(actual.position, axis) - getattr(position, axis)) > REFERENCE_TOLERANCE for axis in "xyz"
+        ):
+            return f"{s.to_bits()}: position {actual.position!r} != {position!r} at tick {tick}"
+    return None
+
+
+def check_trace(case: Case, engine: str) -> Optional[str]:
+    bits_list = [s.to_bits() for s in case.get_settings()]
+    expected = case.create_simulator()
+    batch = get_engine(engine).trace(case.create_simulator(), bits_list)
+    for i, bits in enumerate(bits_list):
+        trace = expected.simulate_scalar(bits)
+        if batch.lengths[i] != len(trace):
+            return f"{bits}: {batch.lengths[i]} ticks != {len(trace)}"
+        for point in trace:
+            actual = batch.point(i, point.tick)
+            if (actual.position, actual.momentum) != (point.position, point.momentum):
+                return f"{bits} tick {point.tick}: {actual} != {point}"
+    return None
+
+
+def search_reference(case: Case) -> List[Tuple[str, int, float]]:
+    pos = Vec3d(case.pearl_x, case.player_y, case.pearl_z) + Constant.DELTA_POSITION[0]
+    angle = Vec3d(case.dest_x - pos.x, 0, case.dest_z - pos.z).angle()
+    delta = 10.0 / case.max_tnt
+    a1 = angle - delta
+    a2 = angle + delta
+    pi = math.pi
+
+    results = []
+    for d in range(4):
+        for i in range(case.max_tnt + 1):
+            flag_success = False
+            flag_break = False
+            j = 0
+            while not flag_break and j <= case.max_tnt:
+                for p in range(2):
+                    s = Setting(i, j, d, p)
+                    thrust_angle = s.get_thrust(case.rotation).angle()
+                    if not (
+                        (a1 < thrust_angle < a2)
+                        or (a1 < thrust_angle + 2 * pi < a2)
+                        or (a1 < thrust_angle - 2 * pi < a2)
+                    ):
+                        if flag_success:
+                            flag_break = True
+                            break
+                        continue
+                    flag_success = True
+                    best = simulate_reference(case, s)
+                    if best is not None:
+                        results.append((s.to_bits(), best[0], best[1]))
+                j += 1
+
+    results.sort(key=lambda x: x[2])
+    return results
+
+
+def check_search(case: Case, engine: str) -> Optional[str]:
+    tolerance = getattr(ENGINES[engine], "TOLERANCE", 0.0)
+    actual = case.create_planner(engine).generate(case.dest_x, case.dest_z)
+    if case.search_mode in REFERENCE_SEARCH_MODES:
+        reference = search_reference(case)
+        found = {bits: (tick, distance) for bits, tick, distance in reference}
+        expected = reference[:SEARCH_MAX_RESULTS]
+        if len(expected) != len(actual):
+            return f"{len(actual)} results != {len(expected)} (reference)"
+        for i, ((_, _, distance), b) in enumerate(zip(expected, actual)):
+            if abs(b.distance - distance) > REFERENCE_TOLERANCE + tolerance:
+                return f"#{i + 1}: distance {b.distance!r} != {distance!r} (reference)"
+            if b.bits not in found:
+                return f"#{i + 1}: {b.bits} is not in the reference window"
+            tick, distance = found[b.bits]
+            if b.tick != tick or abs(b.distance - distance) > REFERENCE_TOLERANCE + tolerance:
+                return f"#{i + 1}: {b} != tick {tick}, distance {distance!r} (reference)"
+        return None
+
+    expected = case.create_planner("scalar").generate(case.dest_x, case.dest_z)
+    if len(expected) != len(actual):
+        return f"{len(actual)} results != {len(expected)}"
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if ENGINES[engine].EXACT:
+            if (a.bits, a.tick, a.distance, a.position) != (b.bits, b.tick, b.distance, b.position):
+                return f"#{i + 1}: {b} != {a}"
+        elif abs(a.distance - b.distance) > tolerance:
+            return f"#{i + 1}: distance {b.distance!r} != {a.distance!r}"
+    return None
+
+
+CHECKS: Dict[str, Tuple[Callable[[Case, Optional[str]], Optional[str]], bool]] = {
+    "bits": (check_bits, False),
+    "reference": (check_reference, False),
+    "engine": (check_engine, True),
+    "trace": (check_trace, True),
+    "search": (check_search, True),
+}
+
+
+def simplify_float(value: float) -> Iterator[float]:
+    for candidate in (0.0, float(round(value)), round(value, 1), round(value, 3)):
+        if len(repr(candidate)) < len(repr(value)) or candidate == 0.0 != value:
+            yield candidate
+
+
+def simplify_int(value: int, lowest: int = 0) -> Iterator[int]:
+    if value <= lowest:
+        return
+    yield lowest
+    step = (value - lowest) // 2
+    while step > 0:
+        yield value - step
+        step //= 2
+
+
+def simplify(case: Case) -> Iterator[Case]:
+    settings = case.settings
+    if len(settings) > 1:
+        half = len(settings) // 2
+        yield replace(case, settings=settings[:half])
+        yield replace(case, settings=settings[half:])
+        for i in range(len(settings)):
+            yield replace(case, settings=settings[:i] + settings[i + 1:])
+
+    for key in ("pearl_x", "pearl_z", "player_y", "ground_y", "dest_x", "dest_z"):
+        for value in simplify_float(getattr(case, key)):
+            yield replace(case, **{key: value})
+
+    for key in ("rotation", "max_tick"):
+        for value in simplify_int(getattr(case, key)):
+            yield replace(case, **{key: value})
+    for value in simplify_int(case.max_tnt, 1):
+        yield replace(case, max_tnt=value)
+    if case.search_mode != "exhaustive":
+        yield replace(case, search_mode="exhaustive")
+
+    for i, s in enumerate(settings):
+        for j in range(4):
+            for value in simplify_int(s[j]):
+                t = list(s)
+                t[j] = value
+                yield replace(case, settings=settings[:i] + [tuple(t)] + settings[i + 1:])
+
+
+def shrink(case: Case, fails: Callable[[Case], bool], max_steps: int = MAX_SHRINK_STEPS) -> Case:
+    steps = 0
+    progress = True
+    while progress and steps < max_steps:
+        progress = False
+        for candidate in simplify(case):
+            steps += 1
+            if fails(candidate):
+                case = candidate
+                progress = True
+                break
+            if steps >= max_steps:
+                break
+    return case
+
+
+def run_check(check: str, case: Case, engine: Optional[str]) -> Optional[Mismatch]:
+    func = CHECKS[check][0]
+    message = func(case, engine)
+    if message is None:
+        return None
+
+    def fails(candidate: Case) -> bool:
+        try:
+            return func(candidate, engine) is not None
+        except Exception:
+            return False
+
+    case = shrink(case, fails)
+    return Mismatch(check, engine, func(case, engine), case)
+
+
+def validate(
+    cases: int,
+    seed: int = 0,
+    engines: Optional[List[str]] = None,
+    checks: Optional[List[str]] = None,
+    search_cases: int = 0,
+) -> Tuple[Dict[str, int], List[Mismatch]]:
+    if engines is None:
+        engines = [name for name in available_engines() if name != "scalar"]
+    if checks is None:
+        checks = list(CHECKS)
+
+    rng = random.Random(seed)
+    counts: Dict[str, int] = {}
+    mismatches = []
+
+    for i in range(cases + search_cases):
+        search = i >= cases
+        case = random_case(rng, search)
+        for check in checks:
+            if (check == "search") != search:
+                continue
+            for engine in engines if CHECKS[check][1] else [None]:
+                name = check if engine is None else f"{check}:{engine}"
+                counts[name] = counts.get(name, 0) + 1
+                mismatch = run_check(check, case, engine)
+                if mismatch is not None:
+                    mismatches.append(mismatch)
+
+    return counts, mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pearl_properties_generator.validation",
+        description="用随机配置对比各模拟引擎与逐 tick 参考模拟的结果",
+    )
+    parser.add_argument(
+        "-n", "--cases", type=int, default=200, help=f"随机配置数, 每个配置含 {SETTINGS_PER_CASE} 个随机比特序列"
+    )
+    parser.add_argument("-s", "--search-cases", type=int, default=10, help="额外对比完整搜索结果的随机配置数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-e", "--engine", action="append", choices=list(ENGINES), help="要验证的引擎, 可重复, 默认为全部可用引擎"
+    )
+    parser.add_argument(
+        "-c", "--check", action="append", choices=list(CHECKS), help="要执行的检查, 可重复, 默认为全部"
+    )
+    args = parser.parse_args(argv)
+
+    engines = args.engine
+    if engines is not None:
+        unavailable = [name for name in engines if not ENGINES[name].available()]
+        if unavailable:
+            parser.error(f"engine not available: {', '.join(unavailable)}")
+
+    start = time.perf_counter()
+    counts, mismatches = validate(args.cases, args.seed, engines, args.check, args.search_cases)
+
+    for name, count in counts.items():
+        failed = sum(1 for m in mismatches if m.name == name)
+        print(f"{name:24} {count - failed:>6}/{count} ok")
+    for m in mismatches:
+        print(f"\nMISMATCH {m.name}: {m.message}")
+        print(json.dumps(asdict(m.case)))
+    print(f"{time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .cache import DependentCache
+from .generator import SettingResult
+from .planner import Planner
+
+
+@dataclass
+class Waypoint:
+    name: str
+    x: float
+    z: float
+    hits: int = 0
+    misses: int = 0
+    refreshed: Optional[float] = None
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+
+class Waypoints:
+    DEPENDS_ON = (
+        "pearl_x",
+        "pearl_z",
+        "player_y",
+        "rotation",
+        "max_tnt",
+        "ground_y",
+        "max_tick",
+        "max_results",
+        "search_mode",
+        "pareto_tolerance",
+        "sensitivity",
+        "engine",
+    )
+    IDLE_SECONDS = 30.0
+    CHECK_INTERVAL = 5.0
+    MAX_WAYPOINTS = 256
+
+    def __init__(self, planner: Planner, path: Optional[str] = None):
+        self.planner = planner
+        self.config = planner.config
+        self.path = path
+        self.waypoints: Dict[str, Waypoint] = {}
+        self.cache = DependentCache("waypoints", self.DEPENDS_ON, max_entries=self.MAX_WAYPOINTS)
+        self.version = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        if path is not None:
+            self.load()
+        self.config.add_listener(self.on_config_changed)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        for name, value in data.items():
+            try:
+                self.waypoints[name] = Waypoint(name, float(value["x"]), float(value["z"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {w.name: {"x": w.x, "z": w.z} for w in self.waypoints.values()}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+
+    def names(self) -> List[str]:
+        return sorted(self.waypoints)
+
+    def get(self, name: str) -> Optional[Waypoint]:
+        return self.waypoints.get(name)
+
+    def add(self, name: str, x: float, z: float) -> bool:
+        with self.lock:
+            if name not in self.waypoints and len(self.waypoints) >= self.MAX_WAYPOINTS:
+                return False
+            old = self.waypoints.get(name)
+            waypoint = Waypoint(name, x, z)
+            if old is not None:
+                waypoint.hits, waypoint.misses = old.hits, old.misses
+            self.waypoints[name] = waypoint
+            self.cache.pop(name)
+        self.save()
+        return True
+
+    def remove(self, name: str) -> bool:
+        with self.lock:
+            if self.waypoints.pop(name, None) is None:
+                return False
+            self.cache.pop(name)
+        self.save()
+        return True
+
+    def on_config_changed(self, key: str):
+        with self.lock:
+            if self.cache.on_config_changed(key):
+                self.version += 1
+
+    def close(self):
+        self.stop()
+        self.config.remove_listener(self.on_config_changed)
+
+    def compute(self, waypoint: Waypoint, kind: str) -> List[SettingResult]:
+        version = self.version
+        start = time.perf_counter()
+        generator = self.planner.create_generator(waypoint.x, waypoint.z)
+        results = generator.generate()
+        self.planner.analyze_sensitivity(results)
+        self.planner.record(
+            kind, f"@{waypoint.name}", generator.engine, time.perf_counter() - start, generator.simulated
+        )
+
+        with self.lock:
+            if version == self.version and self.waypoints.get(waypoint.name) is waypoint:
+                self.cache.put(waypoint.name, results)
+                waypoint.refreshed = time.time()
+        return results
+
+    def is_warm(self, waypoint: Waypoint) -> bool:
+        return waypoint.name in self.cache
+
+    def generate(self, name: str) -> Optional[Tuple[List[SettingResult], bool]]:
+        waypoint = self.waypoints.get(name)
+        if waypoint is None:
+            return None
+
+        results = self.cache.get(name)
+        with self.lock:
+            if results is not None:
+                waypoint.hits += 1
+            else:
+                waypoint.misses += 1
+        if results is not None:
+            # a hit must never trigger calibration
+            self.planner.record("gen", f"@{name}", self.planner.peek_engine(), 0.0)
+            return list(results), True
+        return list(self.compute(waypoint, "gen")), False
+
+    def idle_for(self) -> float:
+        last_activity = self.planner.last_activity
+        for record in reversed(self.planner.history):
+            if record.kind != "waypoint":
+                last_activity = max(last_activity, record.time)
+                break
+        return time.time() - last_activity
+
+    def next_cold(self) -> Optional[Waypoint]:
+        cold = [w for w in list(self.waypoints.values()) if not self.is_warm(w)]
+        if not cold:
+            return None
+        return max(cold, key=lambda w: (w.hits + w.misses, w.name))
+
+    def refresh(self, limit: Optional[int] = None) -> int:
+        count = 0
+        while limit is None or count < limit:
+            waypoint = self.next_cold()
+            if waypoint is None:
+                break
+            self.compute(waypoint, "waypoint")
+            count += 1
+        return count
+
+    def run(self):
+        while not self.stop_event.wait(self.CHECK_INTERVAL):
+            while not self.stop_event.is_set() and self.idle_for() >= self.IDLE_SECONDS:
+                try:
+                    if not self.refresh(limit=1):
+                        break
+                except Exception:
+                    break
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="PPG-Waypoints", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join(timeout=self.CHECK_INTERVAL)
+        self.thread = None
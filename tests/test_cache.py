@@ -0,0 +1,59 @@
+from pearl_properties_generator.cache import DependentCache
+from pearl_properties_generator.config import Config
+from pearl_properties_generator.planner import Planner
+
+
+def test_invalidated_only_by_dependencies():
+    cache = DependentCache("test", ("max_tnt", "max_tick"))
+    cache.put("a", 1)
+
+    assert not cache.on_config_changed("pearl_x")
+    assert cache.get("a") == 1
+
+    assert cache.on_config_changed("max_tick")
+    assert cache.get("a") is None
+    assert cache.invalidations == 1
+
+
+def test_evicts_least_recently_used():
+    cache = DependentCache("test", (), max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+def test_peek_does_not_count():
+    cache = DependentCache("test", ())
+    cache.put("a", 1)
+
+    assert cache.peek("a") == 1
+    assert cache.peek("b") is None
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_planner_caches_follow_config_keys():
+    config = Config()
+    config.set("max_tnt", 100)
+    config.set("engine", "scalar")
+    planner = Planner(config)
+    planner.generate(100, 200)
+    sizes = {cache.name: len(cache) for cache in planner.caches()}
+    assert sizes["results"] and sizes["trajectories"] and sizes["landing"]
+
+    # translation-invariant: moving the cannon keeps everything
+    config.set("pearl_x", 12.5)
+    assert {cache.name: len(cache) for cache in planner.caches()} == sizes
+
+    config.set("engine", "closed_form")
+    assert len(planner.result_cache) == 0
+    assert len(planner.trajectory_cache) == 0
+    assert len(planner.landing_cache) == sizes["landing"]
+
+    config.set("max_tnt", 120)
+    assert len(planner.candidate_cache) == 0
+    assert len(planner.landing_cache) == 0
+    planner.close()
@@ -0,0 +1,63 @@
+import io
+import math
+import struct
+
+import pytest
+
+from pearl_properties_generator.export import BinaryWriter
+from pearl_properties_generator.generator import SettingResult, Vec3d
+
+
+def make_result(cannon=None, drift=None) -> SettingResult:
+    return SettingResult(
+        distance=0.25,
+        position=Vec3d(1.5, 64.0, -2.5),
+        tick=42,
+        light_gray=100,
+        dark_gray=200,
+        total_tnt=300,
+        bits="000 000 0000 0000 0 00000 00 00000",
+        direction=3,
+        pitch=1,
+        drift=drift,
+        cannon=cannon,
+    )
+
+
+def read(data: bytes):
+    assert data[:4] == BinaryWriter.MAGIC
+    version, size, count = struct.unpack_from("<HHH", data, 4)
+    offset, names = 10, []
+    for _ in range(count):
+        (length,) = struct.unpack_from("<H", data, offset)
+        names.append(data[offset + 2:offset + 2 + length].decode("utf-8"))
+        offset += 2 + length
+    assert (len(data) - offset) % size == 0
+    records = [BinaryWriter.RECORD.unpack_from(data, i) for i in range(offset, len(data), size)]
+    return version, names, records
+
+
+def test_round_trip():
+    stream = io.BytesIO()
+    writer = BinaryWriter(stream, ["east", "西"])
+    writer.write((10.0, -20.0), [make_result("西", 0.5), make_result(), make_result("east")])
+    writer.close()
+
+    version, names, records = read(stream.getvalue())
+    assert version == BinaryWriter.VERSION
+    assert names == ["east", "西"]
+    assert writer.count == len(records) == 3
+
+    dest_x, dest_z, distance, x, y, z, tick, light, dark, direction, pitch, drift, cannon = records[0]
+    assert (dest_x, dest_z, distance, x, y, z) == (10.0, -20.0, 0.25, 1.5, 64.0, -2.5)
+    assert (tick, light, dark, direction, pitch, drift) == (42, 100, 200, 3, 1, 0.5)
+    assert names[cannon] == "西"
+    assert math.isnan(records[1][11])
+    assert records[1][12] == BinaryWriter.NO_CANNON
+    assert names[records[2][12]] == "east"
+
+
+def test_unknown_cannon_is_an_error():
+    writer = BinaryWriter(io.BytesIO(), ["east"])
+    with pytest.raises(ValueError):
+        writer.write((0.0, 0.0), [make_result("west")])
@@ -0,0 +1,29 @@
+import random
+
+from pearl_properties_generator.generator import ParetoFront
+
+
+def test_dominated_results_are_rejected():
+    front = ParetoFront()
+    assert front.add("a", 1.0, 10, 5)
+    assert not front.add("b", 2.0, 10, 6)
+    assert front.add("c", 0.5, 20, 5)
+    assert sorted(front.results()) == ["a", "c"]
+
+    assert front.add("d", 0.5, 5, 4)
+    assert front.results() == ["d"]
+
+
+def test_matches_brute_force():
+    rng = random.Random(0)
+    points = [(rng.random(), rng.randint(0, 20), rng.randint(0, 20)) for _ in range(500)]
+
+    front = ParetoFront()
+    for point in points:
+        front.add(point, *point)
+
+    expected = [
+        p for p in points
+        if not any(q != p and all(a <= b for a, b in zip(q, p)) for q in points)
+    ]
+    assert sorted(front.results()) == sorted(expected)
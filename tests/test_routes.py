@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("mcdreforged")
+
+from pearl_properties_generator import entry, loadtest
+
+
+@pytest.fixture
+def root(tmp_path):
+    server = loadtest.FakeServer(str(tmp_path))
+    entry.on_load(server, None)
+    yield server.root
+    entry.on_unload(server)
+
+
+def test_commands_reach_their_handlers(root):
+    source = loadtest.FakePlayerSource("route-check", permission=4)
+    assert loadtest.check_routes(root, source) == []
+
+
+def test_waypoint_gen_rejects_trailing_coordinate(root):
+    with pytest.raises(Exception, match="gen @home 5"):
+        loadtest.execute(root, loadtest.FakePlayerSource("player"), f"{entry.PREFIX} gen @home 5")
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from pearl_properties_generator.service import ServiceError, parse_limit, parse_number
+
+
+def test_parse_number():
+    request = {"x": 1, "z": -2.5, "flag": True, "text": "3"}
+    assert parse_number(request, "x") == 1
+    assert parse_number(request, "z") == -2.5
+    assert parse_number(request, "ground_y") is None
+    for key in ("flag", "text"):
+        with pytest.raises(ServiceError) as error:
+            parse_number(request, key)
+        assert error.value.status == 400
+    with pytest.raises(ServiceError):
+        parse_number(request, "ground_y", required=True)
+
+
+@pytest.mark.parametrize("text", ["NaN", "Infinity", "-Infinity"])
+def test_parse_number_rejects_non_finite(text):
+    request = json.loads(f'{{"x": {text}}}')
+    with pytest.raises(ServiceError) as error:
+        parse_number(request, "x")
+    assert error.value.status == 400
+
+
+def test_parse_limit():
+    assert parse_limit({}) is None
+    assert parse_limit({"limit": 0}) == 0
+    assert parse_limit({"limit": 5}) == 5
+    for value in (-1, 1.5, "3", True):
+        with pytest.raises(ServiceError) as error:
+            parse_limit({"limit": value})
+        assert error.value.status == 400